@@ -2,13 +2,14 @@ import numpy as np
 import pandas as pd
 from typing import List, Dict
 from dataclasses import dataclass
-from transformers import pipeline
+from classificador import classificador_ai
+from carrega import carrega_df
 from typing import Dict, List
 import uuid
 import json
 from math import sqrt
 
-@dataclass
+@dataclass(slots=True)
 class Participant:
     id: uuid.UUID
     name: str
@@ -56,40 +57,6 @@ def calculate_objective_score(p1: Participant) -> float:
     
 
 
-def classificador_ai(text: str) -> str:
-    '''
-    Dado un un texto devuelve la predicción de las intenciones de las personas.
-    Posibles etiquetas: socialize, learn, enjoy, win.
-    '''
-
-    # Crear el pipeline de clasificación "zero-shot"
-    clasificador = pipeline("zero-shot-classification", model="typeform/distilbert-base-uncased-mnli")
-
-    # Definir las etiquetas de intenciones y su mapeo a etiquetas cortas
-    long_label = [
-        "I want to socialize or meet new people",
-        "I want to level up my programming skills",
-        "I want to have fun and enjoy",
-        "I want to win."
-    ]
-
-    short_label = [
-        "socialize",
-        "learn",
-        "enjoy",
-        "win"
-    ]
-
-    # Clasificar el texto según las etiquetas
-    resultado = clasificador(text, candidate_labels=long_label)
-
-    # Encontrar la etiqueta con mayor puntaje y mapearla a la etiqueta corta
-    mejor_equivalencia = resultado['labels'][0]
-    indice = long_label.index(mejor_equivalencia)
-    short_label = long_label[indice]
-
-    return short_label
-
 def calculate_role_score(p1: Participant) -> str:
     """Calcula la puntuación basada en roles preferidos (20%) - premia la diferencia"""
     return p1.preferred_role
@@ -231,15 +198,12 @@ def print_team_analysis(teams: List[List[Participant]]):
         
 
 def main() -> None:
-    with open("data/datathon_participants.json", "r", encoding="utf-8") as archivo:
-        datos = json.load(archivo)  # Cargar el contenido como un diccionario de Python
-
-    df = pd.read_json("data/datathon_participants.json")
+    df = carrega_df("data/datathon_participants.json")
     print(df.loc[df['id'] == "2ebad15c-c0ef-4c04-ba98-c5d98403a90c" ])
           
 
 def noumain() -> None:
-    df = pd.read_json('data/datathon_participants.json')
+    df = carrega_df('data/datathon_participants.json')
 
     persona1= df.loc[0]
     persona2= df.loc[1]
@@ -0,0 +1,54 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import equips
+from classificador import SHORT_LABEL, consulta_cache
+
+LEVEL_ORDER = ["Beginner", "Intermediate", "Advanced"]
+YEAR_ORDER = ["1st year", "2nd year", "3rd year", "4th year", "Masters", "PhD"]
+
+
+@dataclass
+class Agregats:
+    experience: pd.Series                 # participantes por nivel de experiencia
+    years: pd.Series                      # participantes por curso
+    interests: List[Tuple[str, int]]      # intereses ordenados por frecuencia
+    objectives: Dict[str, int]            # intención clasificada -> participantes
+    sense_classificar: int                # objetivos que aún no están en la caché
+    skills: pd.DataFrame                  # por habilidad: participantes y nivel medio
+    average_skill: np.ndarray             # nivel medio de cada participante
+
+
+def calcula_agregats(df: pd.DataFrame) -> Agregats:
+    """
+    Calcula de una vez todos los datos del panel de análisis para una lista de participantes.
+    Las intenciones se leen de la caché del clasificador; no se ejecuta el modelo.
+    """
+    interests = Counter(i for llista in df["interests"] if isinstance(llista, list) for i in llista)
+
+    objectius = df["objective"].fillna("").tolist()
+    etiquetes = consulta_cache(objectius)
+    recompte = Counter(etiquetes[o] for o in objectius if o in etiquetes)
+
+    indptr, indices, levels, vocabulary = equips.skill_matrix(df["programming_skills"])
+    noms = np.array(list(vocabulary), dtype=object)
+    participants = np.bincount(indices, minlength=len(noms))
+    nivells = np.bincount(indices, weights=levels, minlength=len(noms))
+    skills = pd.DataFrame({
+        "participants": participants,
+        "mean_level": np.divide(nivells, participants, out=np.zeros(len(noms)), where=participants > 0),
+    }, index=noms).sort_values("participants", ascending=False)
+
+    return Agregats(
+        experience=df["experience_level"].value_counts().reindex(LEVEL_ORDER, fill_value=0),
+        years=df["year_of_study"].value_counts().reindex(YEAR_ORDER, fill_value=0),
+        interests=interests.most_common(),
+        objectives={label: recompte.get(label, 0) for label in SHORT_LABEL},
+        sense_classificar=sum(1 for o in objectius if o not in etiquetes),
+        skills=skills,
+        average_skill=equips.skill_averages(df),
+    )
@@ -0,0 +1,124 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from dataclasses import dataclass, field
+
+from classificador import classify_objectives
+
+# Mismos valores y pesos que las funciones calculate_*_score de programa_definitiu.py
+OBJECTIUS = {"socialize": 1, "learn": 2, "enjoy": 3, "win": 4}
+EXPERIENCIA = {"Beginner": 1, "Intermediate": 2, "Advanced": 3}
+CURSOS = {"1st year": 1, "2nd year": 2, "3rd year": 3, "4th year": 4,
+          "Masters": 5, "PhD": 6}
+ROLS = ["Analysis", "Visualization", "Development", "Design"]
+
+COLUMNES = ["objective", "experience_level", "hackathons_done",
+            "year_of_study", "availability", "preferred_team_size"]
+PESOS = np.array([45, 12, 8, 8, 5, 2], dtype=np.float64)
+
+# Lo que suma `compara` cuando los roles preferidos son distintos
+PENALITZACIO_ROL = 20
+
+
+@dataclass
+class MatriuCaracteristiques:
+    ids: List[str]
+    valors: np.ndarray   # (N, 6) columnas de COLUMNES ya ponderadas
+    rols: np.ndarray     # (N,) código del rol preferido
+    normes: np.ndarray   # (N,) norma al cuadrado de cada fila de `valors`
+    vocabulari_rols: List[str] = field(default_factory=list)  # rol de cada código de `rols`
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def camp(p, nom: str):
+    """Lee un campo tanto de un diccionario como de un dataclass o fila de pandas."""
+    if isinstance(p, dict):
+        return p.get(nom)
+    return getattr(p, nom, None)
+
+
+def codifica_participants(participants: Iterable, intencions: Optional[List[str]] = None) -> MatriuCaracteristiques:
+    """
+    Convierte la lista de participantes en una matriz numérica con las columnas que usa `compara`.
+    Recorre los participantes una sola vez, así que acepta también un iterador (p. ej. de
+    `carrega.llegeix_participants`); para sacar también las restricciones del mismo iterador,
+    usar `taula_participants.codifica`.
+
+    Args:
+        participants (iterable): Participantes como diccionarios, dataclasses o filas de pandas.
+        intencions (list): Etiquetas de objetivo ya calculadas; si no se dan se usa `classify_objectives`.
+
+    Returns:
+        MatriuCaracteristiques: Identificadores, valores ponderados y códigos de rol.
+    """
+    codis_rol: Dict[str, int] = {rol: i for i, rol in enumerate(ROLS)}
+    ids, files, rols, objectius = [], [], [], []
+
+    for p in participants:
+        disponibilitat = camp(p, "availability") or {}
+        ids.append(str(camp(p, "id")))
+        files.append((
+            0,
+            EXPERIENCIA[camp(p, "experience_level")],
+            camp(p, "hackathons_done"),
+            CURSOS[camp(p, "year_of_study")],
+            sum(1 for value in disponibilitat.values() if value),
+            camp(p, "preferred_team_size"),
+        ))
+        rols.append(codis_rol.setdefault(camp(p, "preferred_role"), len(codis_rol)))
+        if intencions is None:
+            objectius.append(camp(p, "objective") or "")
+
+    if intencions is None:
+        intencions = classify_objectives(objectius)
+
+    valors = np.array(files, dtype=np.float64).reshape(len(ids), len(COLUMNES))
+    valors[:, 0] = [OBJECTIUS.get(intencio, 4) for intencio in intencions]
+    valors *= PESOS
+
+    return MatriuCaracteristiques(
+        ids=ids,
+        valors=valors,
+        rols=np.array(rols, dtype=np.int16),
+        normes=np.einsum("ij,ij->i", valors, valors),
+        vocabulari_rols=list(codis_rol),
+    )
+
+
+def distancies_parelles(caracteristiques: MatriuCaracteristiques, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    Equivalente vectorizado de `compara` para las parejas (i[k], j[k]).
+
+    Args:
+        caracteristiques (MatriuCaracteristiques): Matriz devuelta por `codifica_participants`.
+        i, j (array): Índices de fila de los dos miembros de cada pareja.
+
+    Returns:
+        np.ndarray: Puntuación de `compara` para cada pareja.
+    """
+    diferencia = caracteristiques.valors[i] - caracteristiques.valors[j]
+    suma = np.einsum("ij,ij->i", diferencia, diferencia)
+    suma += PENALITZACIO_ROL * (caracteristiques.rols[i] != caracteristiques.rols[j])
+
+    return np.sqrt(suma)
+
+
+def distancies_fila(caracteristiques: MatriuCaracteristiques, i: int) -> np.ndarray:
+    """Puntuación de `compara` entre el participante `i` y todos los demás."""
+    diferencia = caracteristiques.valors - caracteristiques.valors[i]
+    suma = np.einsum("ij,ij->i", diferencia, diferencia)
+    suma += PENALITZACIO_ROL * (caracteristiques.rols != caracteristiques.rols[i])
+
+    return np.sqrt(suma)
+
+
+def subconjunt_caracteristiques(caracteristiques: MatriuCaracteristiques, posicions: np.ndarray) -> MatriuCaracteristiques:
+    """Filas `posicions` de la matriz, en ese orden."""
+    return MatriuCaracteristiques(
+        ids=[caracteristiques.ids[i] for i in posicions],
+        valors=caracteristiques.valors[posicions],
+        rols=caracteristiques.rols[posicions],
+        normes=caracteristiques.normes[posicions],
+        vocabulari_rols=caracteristiques.vocabulari_rols,
+    )
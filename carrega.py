@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+# Columnas con pocos valores distintos que se guardan como categorías
+CATEGORIQUES = ["year_of_study", "shirt_size", "dietary_restrictions", "preferred_role", "experience_level"]
+
+# Campos que usan la puntuación y la formación de equipos (sin los textos largos de presentación)
+CAMPS_EQUIPS = ["id", "name", "objective", "experience_level", "hackathons_done", "year_of_study",
+                "availability", "preferred_team_size", "preferred_role", "preferred_languages",
+                "friend_registration", "programming_skills"]
+
+CACHE_DIR = ".roster_cache"
+
+# Copias binarias que se guardan por nombre de lista (las más antiguas se borran)
+MAX_COPIES = 8
+
+# Listas ya cargadas en este proceso: (nombre, hash) -> Roster, las MAX_CARREGATS usadas más recientemente
+MAX_CARREGATS = 8
+_carregats: "OrderedDict[tuple, Roster]" = OrderedDict()
+
+
+@dataclass
+class Roster:
+    """
+    Lista de participantes leída una sola vez. `participants` son los registros tal cual (para las
+    funciones que trabajan con diccionarios) y `df` el DataFrame con columnas tipadas; comparten
+    las listas y diccionarios anidados (skills, availability...), así que no hay que modificarlos.
+    El mismo objeto se devuelve a todos los que cargan el mismo contenido (`carrega_df` y
+    `carrega_participants` devuelven copias).
+    """
+    digest: str
+    participants: List[dict]
+    df: pd.DataFrame = field(repr=False)
+
+
+def _construeix(digest: str, contingut: bytes) -> Roster:
+    participants = json.loads(contingut)
+    df = pd.DataFrame(participants)
+    for columna in CATEGORIQUES:
+        if columna in df:
+            df[columna] = df[columna].astype("category")
+    return Roster(digest, participants, df)
+
+
+def _desa(path: str, roster: Roster) -> None:
+    # Escritura atómica: otro proceso nunca ve un fichero a medias
+    directori = os.path.dirname(path)
+    os.makedirs(directori, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=directori, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(roster, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, path)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+
+    prefix = os.path.basename(path).rsplit(".", 2)[0] + "."
+    copies = sorted(
+        (os.path.join(directori, f) for f in os.listdir(directori) if f.startswith(prefix) and f.endswith(".pkl")),
+        key=os.path.getmtime,
+    )
+    for antiga in copies[:-MAX_COPIES]:
+        try:
+            os.remove(antiga)
+        except OSError:
+            pass
+
+
+def carrega_bytes(contingut: bytes, nom: str = "roster", cache_dir: Optional[str] = CACHE_DIR) -> Roster:
+    """
+    Carga una lista de participantes a partir del contenido de un fichero JSON.
+    Si ya se cargó antes el mismo contenido se reutiliza la copia binaria sin leer el JSON.
+
+    Args:
+        contingut (bytes): Contenido del fichero JSON (una lista de participantes).
+        nom (str): Nombre con el que se guarda la caché.
+        cache_dir (str): Carpeta de la caché binaria; None para no usarla.
+
+    Returns:
+        Roster: Registros y DataFrame de los participantes.
+    """
+    digest = hashlib.sha256(contingut).hexdigest()
+    if (nom, digest) in _carregats:
+        _carregats.move_to_end((nom, digest))
+        return _carregats[(nom, digest)]
+
+    roster = None
+    path = os.path.join(cache_dir, f"{nom}.{digest[:16]}.pkl") if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                roster = pickle.load(f)
+            if not isinstance(roster, Roster) or roster.digest != digest:
+                roster = None
+        except Exception:
+            # Copia corrupta o de otra versión de pandas (ModuleNotFoundError, TypeError...):
+            # se borra y se vuelve a leer el JSON
+            roster = None
+        if roster is None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    if roster is None:
+        roster = _construeix(digest, contingut)
+        if path:
+            _desa(path, roster)
+
+    _carregats[(nom, digest)] = roster
+    while len(_carregats) > MAX_CARREGATS:
+        _carregats.popitem(last=False)
+    return roster
+
+
+def carrega_pujada(contingut: bytes) -> Roster:
+    """Fichero subido desde la web: solo se guarda en memoria, sin copia en disco (son datos personales)."""
+    return carrega_bytes(contingut, "upload", cache_dir=None)
+
+
+def carrega_roster(path: str = "datathon_participants.json", cache_dir: Optional[str] = None) -> Roster:
+    """Carga `path` con `carrega_bytes`; la caché va a `.roster_cache` junto al fichero."""
+    with open(path, "rb") as f:
+        contingut = f.read()
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    nom = os.path.splitext(os.path.basename(path))[0]
+    return carrega_bytes(contingut, nom, cache_dir)
+
+
+def carrega_participants(path: str = "datathon_participants.json") -> List[dict]:
+    """
+    Participantes como lista de diccionarios (lo que devolvía json.load). Cada diccionario es una
+    copia, así que se pueden añadir o cambiar campos sin tocar la lista cargada en memoria.
+    """
+    return [dict(p) for p in carrega_roster(path).participants]
+
+
+def carrega_df(path: str = "datathon_participants.json") -> pd.DataFrame:
+    """
+    Participantes como DataFrame (lo que devolvía pd.read_json). Es una copia superficial: se
+    pueden añadir columnas sin que aparezcan en las siguientes llamadas.
+    """
+    return carrega_roster(path).df.copy(deep=False)
+
+
+def llegeix_participants(path: str, camps: Optional[Iterable[str]] = None,
+                         chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Lee los participantes de uno en uno de un fichero JSON (una lista) o JSONL (uno por línea),
+    sin cargar el fichero entero en memoria.
+
+    Args:
+        path (str): Fichero JSON o JSONL.
+        camps (iterable): Si se indica, cada registro se queda solo con estos campos.
+        chunk_size (int): Bytes que se leen cada vez.
+
+    Returns:
+        Iterator[dict]: Los participantes en el orden del fichero.
+    """
+    camps = list(camps) if camps is not None else None
+    decoder = json.JSONDecoder()
+
+    def projecta(registre: dict) -> dict:
+        return registre if camps is None else {camp: registre.get(camp) for camp in camps}
+
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size)
+        inici = len(buffer) - len(buffer.lstrip())
+
+        if not buffer[inici:inici + 1] == "[":
+            # JSONL: un participante por línea
+            f.seek(0)
+            for linia in f:
+                if linia.strip():
+                    yield projecta(json.loads(linia))
+            return
+
+        pos = inici + 1
+        llegir = chunk_size
+        while True:
+            # Saltar espacios y comas entre elementos
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer):
+                    break
+                buffer, pos = f.read(chunk_size), 0
+                if not buffer:
+                    raise ValueError(f"{path}: la lista JSON no está cerrada")
+
+            if buffer[pos] == "]":
+                return
+
+            try:
+                registre, fi = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Registro incompleto: leer más (cada vez el doble, para registros muy largos)
+                mes = f.read(llegir)
+                if not mes:
+                    raise
+                buffer = buffer[pos:] + mes
+                pos = 0
+                llegir *= 2
+                continue
+
+            llegir = chunk_size
+            yield projecta(registre)
+            buffer, pos = buffer[fi:], 0
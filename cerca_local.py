@@ -0,0 +1,155 @@
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from caracteristiques import MatriuCaracteristiques, distancies_parelles
+from restriccions import Restriccions
+
+# Mejora mínima para aceptar un cambio (evita ciclos por errores de redondeo)
+EPSILON = 1e-9
+
+# Cada cuántas iteraciones se mira el reloj
+COMPROVA_TEMPS = 128
+
+
+def puntuacio_equips(caracteristiques: MatriuCaracteristiques, equips: Sequence[Sequence[int]]) -> float:
+    """Suma de `compara` entre todas las parejas de cada equipo (lo que maximiza create_teams)."""
+    total = 0.0
+    for equip in equips:
+        if len(equip) > 1:
+            membres = np.asarray(equip)
+            i, j = np.triu_indices(len(membres), 1)
+            total += distancies_parelles(caracteristiques, membres[i], membres[j]).sum()
+    return float(total)
+
+
+def distancies_amb(caracteristiques: MatriuCaracteristiques, i: int, altres: List[int]) -> np.ndarray:
+    """`compara` entre `i` y cada participante de `altres`."""
+    return distancies_parelles(caracteristiques, np.full(len(altres), i), np.asarray(altres, dtype=np.int64))
+
+
+def encaixa(restriccions: Restriccions, i: int, altres: List[int]) -> bool:
+    """True si `i` cumple las restricciones absolutas con todos los participantes de `altres`."""
+    if not altres:
+        return True
+    altres = np.asarray(altres, dtype=np.int64)
+    if not np.all(restriccions.mascares[altres] & restriccions.mascares[i]):
+        return False
+    amb_amics = restriccions.te_amics[altres] | restriccions.te_amics[i]
+    return not amb_amics.any() or bool(np.isin(altres[amb_amics], restriccions.amics(i)).all())
+
+
+def millora_equips(equips: Sequence[Sequence[int]], caracteristiques: MatriuCaracteristiques,
+                   restriccions: Restriccions, max_team_size: int = 4, temps: float = 2.0, seed: int = 0,
+                   max_iteracions: Optional[int] = None,
+                   informa: Optional[Callable[[float], None]] = None,
+                   conserva_buits: bool = False) -> List[List[int]]:
+    """
+    Mejora una asignación de equipos con búsqueda local: intercambia dos participantes de equipos
+    distintos o mueve uno a un equipo con plazas libres, y acepta el cambio si aumenta la suma de
+    `compara` dentro de los equipos.
+
+    Cada participante guarda su contribución (la suma de `compara` con sus compañeros), así que
+    evaluar un cambio solo calcula las distancias con los miembros de los dos equipos afectados.
+    El segundo participante se elige entre los que comparten algún idioma con el primero, y un
+    cambio solo se aplica si los dos equipos resultantes cumplen las restricciones absolutas.
+
+    Args:
+        equips (list): Equipos como listas de posiciones (p. ej. los de `create_team_indices`).
+        caracteristiques (MatriuCaracteristiques): Matriz devuelta por `codifica_participants`.
+        restriccions (Restriccions): Restricciones devueltas por `codifica_restriccions`.
+        max_team_size (int): Tamaño máximo de un equipo.
+        temps (float): Segundos como máximo.
+        seed (int): Semilla; con la misma semilla y `max_iteracions` el resultado es siempre el mismo.
+        max_iteracions (int): Número máximo de cambios que se prueban (sin límite si es None).
+        informa (callable): Recibe la fracción del tiempo consumida cada cierto número de iteraciones.
+        conserva_buits (bool): Devolver también los equipos que se quedan vacíos, para que cada
+            equipo siga en la misma posición.
+
+    Returns:
+        List[List[int]]: Los equipos mejorados, en el mismo orden (sin los que se quedan vacíos).
+    """
+    n = len(caracteristiques)
+    membres = [list(map(int, equip)) for equip in equips]
+    equip_de = np.full(n, -1, dtype=np.int64)
+    contribucio = np.zeros(n, dtype=np.float64)
+    for t, equip in enumerate(membres):
+        equip_de[equip] = t
+        if len(equip) > 1:
+            m = np.asarray(equip)
+            d = distancies_parelles(caracteristiques, np.repeat(m, len(m)), np.tile(m, len(m)))
+            contribucio[m] = d.reshape(len(m), len(m)).sum(axis=1)
+
+    # Participantes de cada idioma, para elegir compañeros de intercambio que puedan encajar
+    mascares = restriccions.mascares
+    per_idioma: Dict[int, np.ndarray] = {}
+    for bit in restriccions.idiomes.values():
+        per_idioma[bit] = np.flatnonzero(((mascares >> np.uint64(bit)) & np.uint64(1)) & (equip_de >= 0))
+    bits_de: Dict[int, List[int]] = {}
+
+    candidats = np.flatnonzero((equip_de >= 0) & (mascares != 0))
+    if not len(candidats):
+        return membres if conserva_buits else [equip for equip in membres if equip]
+
+    rng = random.Random(seed)
+    inici = time.perf_counter()
+    iteracio = 0
+
+    while max_iteracions is None or iteracio < max_iteracions:
+        iteracio += 1
+        if iteracio % COMPROVA_TEMPS == 0:
+            transcorregut = time.perf_counter() - inici
+            if transcorregut >= temps:
+                break
+            if informa is not None:
+                informa(transcorregut / temps)
+
+        i = int(candidats[rng.randrange(len(candidats))])
+        if i not in bits_de:
+            bits_de[i] = [bit for bit in per_idioma if int(mascares[i]) >> bit & 1]
+        companys = per_idioma[rng.choice(bits_de[i])]
+        j = int(companys[rng.randrange(len(companys))])
+
+        a, b = equip_de[i], equip_de[j]
+        if a == b:
+            continue
+        resta_a = [k for k in membres[a] if k != i]
+
+        if len(membres[b]) < max_team_size and rng.random() < 0.5:
+            # Mover i al equipo de j
+            if not encaixa(restriccions, i, membres[b]):
+                continue
+            cap_b = distancies_amb(caracteristiques, i, membres[b])
+            if cap_b.sum() - contribucio[i] <= EPSILON:
+                continue
+
+            if resta_a:
+                contribucio[resta_a] -= distancies_amb(caracteristiques, i, resta_a)
+            contribucio[membres[b]] += cap_b
+            contribucio[i] = cap_b.sum()
+            membres[a] = resta_a
+            membres[b].append(i)
+            equip_de[i] = b
+        else:
+            # Intercambiar i y j
+            resta_b = [k for k in membres[b] if k != j]
+            if not (encaixa(restriccions, i, resta_b) and encaixa(restriccions, j, resta_a)):
+                continue
+            i_amb_b = distancies_amb(caracteristiques, i, resta_b)
+            j_amb_a = distancies_amb(caracteristiques, j, resta_a)
+            if i_amb_b.sum() + j_amb_a.sum() - contribucio[i] - contribucio[j] <= EPSILON:
+                continue
+
+            if resta_a:
+                contribucio[resta_a] += j_amb_a - distancies_amb(caracteristiques, i, resta_a)
+            if resta_b:
+                contribucio[resta_b] += i_amb_b - distancies_amb(caracteristiques, j, resta_b)
+            contribucio[i] = i_amb_b.sum()
+            contribucio[j] = j_amb_a.sum()
+            membres[a] = resta_a + [j]
+            membres[b] = resta_b + [i]
+            equip_de[i], equip_de[j] = b, a
+
+    return membres if conserva_buits else [equip for equip in membres if equip]
@@ -1,4 +1,136 @@
-from transformers import pipeline
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+MODEL = "typeform/distilbert-base-uncased-mnli"
+
+# Fichero donde se guardan las etiquetas ya inferidas entre ejecuciones
+# (relativo a este módulo, para que no dependa del directorio desde el que se ejecuta)
+CACHE_PATH = os.environ.get(
+    "AED_CACHE_INTENCIONS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_intencions.sqlite")
+)
+
+# Definir las etiquetas de intenciones y su mapeo a etiquetas cortas
+LONG_LABEL = [
+    "I want to socialize or meet new people",
+    "I want to level up my programming skills",
+    "I want to have fun and enjoy",
+    "I want to win."
+]
+
+SHORT_LABEL = [
+    "socialize",
+    "learn",
+    "enjoy",
+    "win"
+]
+
+# Pipeline compartido por todo el proceso: se carga la primera vez que se usa
+_clasificador = None
+_model_carregat: Optional[str] = None
+_lock = threading.Lock()
+
+# Copia en memoria de las etiquetas ya consultadas: fichero de caché -> (clave -> etiqueta corta)
+_memoria: Dict[str, Dict[str, str]] = {}
+
+
+def carrega_classificador(model: Optional[str] = None):
+    '''
+    Devuelve el pipeline "zero-shot" compartido, cargándolo solo la primera vez.
+    Sirve también para precalentar el modelo antes de puntuar una lista entera.
+    Si se pide un modelo distinto del que está cargado, se carga el nuevo en su lugar.
+    '''
+    global _clasificador, _model_carregat
+
+    def cal_carregar() -> bool:
+        return _clasificador is None or (model is not None and model != _model_carregat)
+
+    if cal_carregar():
+        with _lock:
+            if cal_carregar():
+                from transformers import pipeline
+
+                nou = model or MODEL
+                _clasificador = pipeline("zero-shot-classification", model=nou)
+                _model_carregat = nou
+
+    return _clasificador
+
+
+def allibera_classificador() -> None:
+    '''Libera el pipeline compartido; la próxima llamada lo volverá a cargar.'''
+    global _clasificador, _model_carregat
+
+    with _lock:
+        _clasificador = None
+        _model_carregat = None
+
+
+def model_actual() -> str:
+    '''Modelo con el que se clasifica: el cargado o, si aún no hay ninguno, MODEL.'''
+    return _model_carregat or MODEL
+
+
+def _clau(text: str, model: Optional[str] = None) -> str:
+    """Hash del texto junto con el modelo y las etiquetas candidatas."""
+    contingut = json.dumps([model or model_actual(), LONG_LABEL, text], ensure_ascii=False)
+    return hashlib.sha256(contingut.encode("utf-8")).hexdigest()
+
+
+def _memoria_de(path: Optional[str]) -> Dict[str, str]:
+    return _memoria.setdefault(os.path.abspath(path or CACHE_PATH), {})
+
+
+def _connecta(path: Optional[str] = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(path or CACHE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS intencions (clau TEXT PRIMARY KEY, etiqueta TEXT NOT NULL)")
+    return conn
+
+
+def consulta_cache(texts: Iterable[str], path: Optional[str] = None) -> Dict[str, str]:
+    '''
+    Busca en la caché persistente las etiquetas de los textos dados.
+
+    Returns:
+        Dict[str, str]: Texto -> etiqueta corta, solo para los textos ya clasificados.
+    '''
+    memoria = _memoria_de(path)
+    model = model_actual()
+    claus = {_clau(text, model): text for text in texts}
+    trobades = {clau: memoria[clau] for clau in claus if clau in memoria}
+
+    pendents = [clau for clau in claus if clau not in trobades]
+    if pendents:
+        with _connecta(path) as conn:
+            for i in range(0, len(pendents), 500):
+                tros = pendents[i:i + 500]
+                files = conn.execute(
+                    f"SELECT clau, etiqueta FROM intencions WHERE clau IN ({','.join('?' * len(tros))})", tros
+                ).fetchall()
+                trobades.update(files)
+        conn.close()
+        memoria.update(trobades)
+
+    return {claus[clau]: etiqueta for clau, etiqueta in trobades.items()}
+
+
+def desa_cache(etiquetes: Dict[str, str], path: Optional[str] = None) -> None:
+    '''Guarda en la caché persistente las etiquetas nuevas (texto -> etiqueta corta).'''
+    model = model_actual()
+    files = [(_clau(text, model), etiqueta) for text, etiqueta in etiquetes.items()]
+    if not files:
+        return
+
+    # INSERT OR REPLACE es atómico en SQLite: varios procesos pueden escribir a la vez
+    with _connecta(path) as conn:
+        conn.executemany("INSERT OR REPLACE INTO intencions (clau, etiqueta) VALUES (?, ?)", files)
+    conn.close()
+    _memoria_de(path).update(files)
+
 
 def classificador_ai(text: str) -> str:
     '''
@@ -6,30 +138,50 @@ def classificador_ai(text: str) -> str:
     Posibles etiquetas: socialize, learn, enjoy, win.
     '''
 
-    # Crear el pipeline de clasificación "zero-shot"
-    clasificador = pipeline("zero-shot-classification", model="typeform/distilbert-base-uncased-mnli")
-
-    # Definir las etiquetas de intenciones y su mapeo a etiquetas cortas
-    long_label = [
-        "I want to socialize or meet new people",
-        "I want to level up my programming skills",
-        "I want to have fun and enjoy",
-        "I want to win."
-    ]
+    guardada = consulta_cache([text])
+    if text in guardada:
+        return guardada[text]
 
-    short_label = [
-        "socialize",
-        "learn",
-        "enjoy",
-        "win"
-    ]
+    clasificador = carrega_classificador()
 
     # Clasificar el texto según las etiquetas
-    resultado = clasificador(text, candidate_labels=long_label)
+    resultado = clasificador(text, candidate_labels=LONG_LABEL)
 
     # Encontrar la etiqueta con mayor puntaje y mapearla a la etiqueta corta
     mejor_equivalencia = resultado['labels'][0]
-    indice = long_label.index(mejor_equivalencia)
-    short_label = long_label[indice]
+    indice = LONG_LABEL.index(mejor_equivalencia)
+    desa_cache({text: SHORT_LABEL[indice]})
+
+    return SHORT_LABEL[indice]
+
+
+def classify_objectives(texts: Iterable[str], batch_size: int = 32) -> List[str]:
+    '''
+    Clasifica muchos objetivos de golpe pasando los textos al modelo en lotes.
+    Los textos repetidos o ya guardados en la caché no se vuelven a clasificar.
+
+    Args:
+        texts (iterable): Objetivos en texto libre, en el orden de los participantes.
+        batch_size (int): Número de pares texto-hipótesis que el modelo procesa por lote.
+
+    Returns:
+        List[str]: Etiqueta corta (socialize, learn, enjoy, win) para cada texto.
+    '''
+    texts = list(texts)
+    etiquetas = consulta_cache(dict.fromkeys(texts))
+    unicos = [text for text in dict.fromkeys(texts) if text not in etiquetas]
+
+    if unicos:
+        clasificador = carrega_classificador()
+        resultados = clasificador(unicos, candidate_labels=LONG_LABEL, batch_size=batch_size)
+        if isinstance(resultados, dict):
+            resultados = [resultados]
+
+        nuevas = {
+            text: SHORT_LABEL[LONG_LABEL.index(resultado['labels'][0])]
+            for text, resultado in zip(unicos, resultados)
+        }
+        desa_cache(nuevas)
+        etiquetas.update(nuevas)
 
-    return short_label
+    return [etiquetas[text] for text in texts]
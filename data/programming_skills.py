@@ -10,7 +10,8 @@ class Participant:
     def __str__(self):
         return f"{self.name} (ID: {self.id})"
 
-# Función para calcular la compatibilidad entre dos participantes
+# Función para calcular la compatibilidad entre dos participantes. Compara los nombres tal cual
+# (este script no usa habilitats.canonicalitza): "java script" y "JavaScript" cuentan como distintos
 def compatibillity_programming_skills(p1: Participant, p2: Participant) -> float:
     compatibility_score = 0
     common_languages = set(p1.programming_skills.keys()) & set(p2.programming_skills.keys())
@@ -27,10 +28,8 @@ def compatibillity_programming_skills(p1: Participant, p2: Participant) -> float
     unique_languages_p1 = set(p1.programming_skills.keys()) - common_languages
     unique_languages_p2 = set(p2.programming_skills.keys()) - common_languages
     
-    for lang1 in unique_languages_p1:
-        for lang2 in unique_languages_p2:
-            # Complementariedad de habilidades
-            compatibility_score += 1  # Valor de compatibilidad por tener habilidades complementarias
+    # Complementariedad de habilidades: 1 por cada pareja (lang1, lang2) de lenguajes no comunes
+    compatibility_score += len(unique_languages_p1) * len(unique_languages_p2)
 
     return compatibility_score
 
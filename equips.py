@@ -1,75 +1,136 @@
-import pandas as pd
-import json
+import numpy as np
+
+from carrega import carrega_df
+from habilitats import matriu_habilitats
+
+def skill_matrix(programming_skills):
+    """
+    Explode the programming_skills dictionaries into a sparse (CSR) participant × skill matrix,
+    with skill names mapped to the canonical vocabulary of habilitats.py.
+
+    Args:
+        programming_skills (iterable): One {skill: level} dictionary per participant.
+
+    Returns:
+        Tuple: (indptr, indices, levels, vocabulary). The skills of participant i are
+               indices[indptr[i]:indptr[i + 1]] with levels levels[indptr[i]:indptr[i + 1]].
+    """
+    matrix = matriu_habilitats(programming_skills)
+    vocabulary = {skill: i for i, skill in enumerate(matrix.vocabulari)}
+
+    return matrix.indptr, matrix.indices, matrix.nivells.astype(np.float64), vocabulary
+
+def skill_averages(participants_df):
+    """
+    Average skill level of every participant (0 for participants without skills).
+
+    Args:
+        participants_df (DataFrame): Must include 'programming_skills' as a dictionary.
+
+    Returns:
+        np.ndarray: One average per row of participants_df.
+    """
+    return matriu_habilitats(participants_df["programming_skills"]).mitjanes()
+
+def skill_order(participants_df):
+    """Row positions sorted by average skill, highest first."""
+    return np.argsort(-skill_averages(participants_df), kind="stable")
 
 def divide_by_skill(participants_df):
     """
     Divide a DataFrame of participants into three skill-based groups.
-    
+
     Args:
         participants_df (DataFrame): DataFrame containing participant information.
                                      Must include 'programming_skills' as a dictionary.
-    
+
     Returns:
         Tuple: Three lists of participant names for high, mid, and low skill groups.
     """
-    # Calcular la habilidad promedio para cada participante
-    participants_df["average_skill"] = participants_df["programming_skills"].apply(
-        lambda skills: sum(skills.values()) / len(skills) if skills else 0
-    )
-    
-    # Ordenar por habilidad promedio en orden descendente
-    sorted_df = participants_df.sort_values(by="average_skill", ascending=False)
-    
+    # Ordenar por habilidad promedio en orden descendente (sin modificar el DataFrame)
+    names = participants_df["name"].to_numpy()[skill_order(participants_df)]
+
     # Dividir a los participantes en tres grupos según la habilidad promedio
-    total = len(sorted_df)
-    high_skill = sorted_df.iloc[: total // 3]["name"].tolist()
-    mid_skill = sorted_df.iloc[total // 3 : 2 * total // 3]["name"].tolist()
-    low_skill = sorted_df.iloc[2 * total // 3 :]["name"].tolist()
-    
+    total = len(names)
+    high_skill = names[: total // 3].tolist()
+    mid_skill = names[total // 3 : 2 * total // 3].tolist()
+    low_skill = names[2 * total // 3 :].tolist()
+
     return high_skill, mid_skill, low_skill
 
+def assign_teams_by_skill(participants_df, max_team_size=4):
+    """
+    Team number of every participant, filling teams in order of decreasing average skill
+    (the same teams form_teams_by_skill builds from the three skill groups).
+
+    Args:
+        participants_df (DataFrame): Must include 'programming_skills' as a dictionary.
+        max_team_size (int): Maximum size of each team.
+
+    Returns:
+        np.ndarray: Team index (starting at 0) for each row of participants_df.
+    """
+    order = skill_order(participants_df)
+    assignments = np.empty(len(order), dtype=np.int64)
+    assignments[order] = np.arange(len(order)) // max_team_size
+
+    return assignments
+
 def form_teams_by_skill(high_skill, mid_skill, low_skill, max_team_size=4):
     """
     Form teams from participants in all skill groups and return a JSON-like structure with sequential team names.
-    
+
     Args:
         high_skill, mid_skill, low_skill (list): Lists of participant names grouped by skill levels.
         max_team_size (int): Maximum size of each team.
-    
+
     Returns:
         List: List of dictionaries with team names and members.
     """
-    def form_teams_from_group(group):
-        teams = []
-        while group:
-            team_members = []
-            while len(team_members) < max_team_size and group:
-                team_members.append(group.pop(0))  # Add participant to the team
-            teams.append(team_members)
-        return teams
-
     # Combine all groups and form teams
     combined_groups = high_skill + mid_skill + low_skill
-    all_teams = form_teams_from_group(combined_groups)
-    
+    all_teams = [combined_groups[i:i + max_team_size] for i in range(0, len(combined_groups), max_team_size)]
+
     # Create JSON-like structure
     teams_json = [
         {"team_group": f"Team {i + 1}", "members": team}
         for i, team in enumerate(all_teams)
     ]
-    
+
     return teams_json
 
-def create_teams():
+def teams_from_assignments(participants_df, assignments):
+    """
+    Build the JSON-like team structure from a team index per participant.
+
+    Args:
+        participants_df (DataFrame): DataFrame containing a 'name' column.
+        assignments (np.ndarray): Team index for each row of participants_df.
+
+    Returns:
+        List: List of dictionaries with team names and members.
+    """
+    names = participants_df["name"].to_numpy()
+    order = np.argsort(assignments, kind="stable")
+    bounds = np.flatnonzero(np.diff(assignments[order])) + 1
+
+    return [
+        {"team_group": f"Team {i + 1}", "members": names[members].tolist()}
+        for i, members in enumerate(np.split(order, bounds)) if len(members)
+    ]
+
+def create_teams(participants_df=None, max_team_size=4):
     # Create a pandas DataFrame
-    participants_df = pd.read_json("datathon_participants.json")
+    if participants_df is None:
+        participants_df = carrega_df("datathon_participants.json")
 
-    # Divide participants into skill groups
-    high_skill, mid_skill, low_skill = divide_by_skill(participants_df)
+    # Assign every participant to a team by skill level
+    assignments = assign_teams_by_skill(participants_df, max_team_size)
 
     # Form teams and return JSON-like structure
-    teams_by_skill = form_teams_by_skill(high_skill, mid_skill, low_skill)
-    
+    teams_by_skill = teams_from_assignments(participants_df, assignments)
+
     return teams_by_skill  # Convert to JSON string for readability
 
-print (create_teams())
\ No newline at end of file
+if __name__ == '__main__':
+    print (create_teams())
@@ -0,0 +1,164 @@
+import operator
+from functools import reduce
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from caracteristiques import MatriuCaracteristiques, subconjunt_caracteristiques
+from cerca_local import millora_equips
+from multi_inici import MAX_PROCESSOS, executa
+from restriccions import Restriccions, UnioConjunts, subconjunt_restriccions
+
+# Tamaño a partir del cual una componente se divide por idiomas
+MIDA_FRAGMENT = 5000
+
+
+def _bits(mascara: int) -> List[int]:
+    bits = []
+    while mascara:
+        bits.append((mascara & -mascara).bit_length() - 1)
+        mascara &= mascara - 1
+    return bits
+
+
+def _divideix(restriccions: Restriccions, posicions: np.ndarray) -> List[np.ndarray]:
+    """
+    Divide una componente en un fragmento por idioma. Los grupos de amigos van juntos; los que
+    hablan un solo idioma (en común) van a su fragmento y los multilingües, que hacen de puente
+    entre fragmentos, al más pequeño de sus idiomas.
+    """
+    local = np.full(len(restriccions), -1, dtype=np.int64)
+    local[posicions] = np.arange(len(posicions))
+    conjunts = UnioConjunts(len(posicions))
+    for k, i in enumerate(posicions):
+        for j in local[restriccions.amics(i)]:
+            if j >= 0:
+                conjunts.uneix(k, int(j))
+
+    unitats: Dict[int, List[int]] = {}
+    for k in range(len(posicions)):
+        unitats.setdefault(conjunts.arrel(k), []).append(k)
+
+    monolingues, ponts = [], []
+    for unitat in unitats.values():
+        mascares = [int(restriccions.mascares[posicions[k]]) for k in unitat]
+        idiomes = _bits(reduce(operator.and_, mascares) or reduce(operator.or_, mascares))
+        (monolingues if len(idiomes) == 1 else ponts).append((unitat, idiomes))
+
+    per_idioma: Dict[int, List[int]] = {}
+    for unitat, idiomes in monolingues:
+        per_idioma.setdefault(idiomes[0], []).extend(unitat)
+    for unitat, idiomes in ponts:
+        idioma = min(idiomes, key=lambda b: len(per_idioma.get(b, [])))
+        per_idioma.setdefault(idioma, []).extend(unitat)
+
+    return [posicions[np.sort(np.array(k, dtype=np.int64))] for k in per_idioma.values() if k]
+
+
+def fragmenta(restriccions: Restriccions, mida_maxima: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Divide a los participantes según las componentes conexas del grafo "comparten algún idioma".
+    Dos participantes de componentes distintas nunca pueden ir al mismo equipo, así que formar
+    los equipos de cada componente por separado da el mismo resultado que hacerlo todo junto.
+
+    Args:
+        restriccions (Restriccions): Restricciones devueltas por `codifica_restriccions`.
+        mida_maxima (int): Si se indica, las componentes más grandes se dividen además por idioma
+            (ver `_divideix`); entonces ya no es exacto, los multilingües solo pueden formar
+            equipo dentro del fragmento que se les asigna. Un fragmento de un solo idioma puede
+            seguir siendo más grande que `mida_maxima`.
+
+    Returns:
+        List[np.ndarray]: Posiciones de cada fragmento, del más grande al más pequeño. Los
+        participantes sin ningún idioma forman un fragmento aparte.
+    """
+    # Dos idiomas están conectados si alguien habla los dos
+    idiomes = UnioConjunts(64)
+    for mascara in set(int(m) for m in restriccions.mascares):
+        bits = _bits(mascara)
+        for bit in bits[1:]:
+            idiomes.uneix(bits[0], bit)
+
+    components: Dict[int, List[int]] = {}
+    sense_idioma = []
+    for i, mascara in enumerate(restriccions.mascares):
+        mascara = int(mascara)
+        if mascara:
+            components.setdefault(idiomes.arrel((mascara & -mascara).bit_length() - 1), []).append(i)
+        else:
+            sense_idioma.append(i)
+
+    fragments = [np.array(c, dtype=np.int64) for c in components.values()]
+    if mida_maxima is not None:
+        fragments = [f for c in fragments for f in (_divideix(restriccions, c) if len(c) > mida_maxima else [c])]
+    if sense_idioma:
+        fragments.append(np.array(sense_idioma, dtype=np.int64))
+
+    return sorted(fragments, key=len, reverse=True)
+
+
+def _forma_fragment(caracteristiques: MatriuCaracteristiques, restriccions: Restriccions,
+                    max_team_size: int, temps: float) -> List[List[int]]:
+    from programa_definitiu import create_team_indices
+
+    equips = create_team_indices(range(len(caracteristiques)), max_team_size, caracteristiques, restriccions)
+    if temps > 0:
+        equips = millora_equips(equips, caracteristiques, restriccions, max_team_size, temps=temps)
+    return equips
+
+
+def forma_equips_per_fragments(caracteristiques: MatriuCaracteristiques, restriccions: Restriccions,
+                               max_team_size: int = 4, mida_maxima: Optional[int] = MIDA_FRAGMENT,
+                               processos: Optional[int] = None, temps: float = 0.0,
+                               informa: Optional[Callable[[float], None]] = None) -> List[List[int]]:
+    """
+    Forma los equipos de cada fragmento de `fragmenta` por separado y en paralelo, y los junta.
+    El coste pasa a depender del fragmento más grande en lugar del número total de inscritos.
+
+    Args:
+        caracteristiques (MatriuCaracteristiques): Matriz devuelta por `codifica_participants`.
+        restriccions (Restriccions): Restricciones devueltas por `codifica_restriccions`.
+        max_team_size (int): Tamaño máximo de un equipo.
+        mida_maxima (int): Ver `fragmenta` (None para usar solo las componentes exactas).
+        processos (int): Fragmentos a la vez como máximo en el pool de `multi_inici.pool_processos`
+            (por defecto y como mucho, MAX_PROCESSOS); con 1 se hacen en este proceso.
+        temps (float): Segundos de búsqueda local para el fragmento más grande; los demás
+            reciben una parte proporcional a su tamaño.
+        informa (callable): Recibe la fracción de participantes ya repartidos cada vez que
+            termina un fragmento.
+
+    Returns:
+        List[List[int]]: Los equipos como listas de posiciones, ordenados por su primer miembro.
+    """
+    fragments = fragmenta(restriccions, mida_maxima)
+    if not fragments:
+        return []
+    processos = min(processos or MAX_PROCESSOS, MAX_PROCESSOS)
+
+    tasques = [
+        (_forma_fragment, subconjunt_caracteristiques(caracteristiques, f), subconjunt_restriccions(restriccions, f),
+         max_team_size, temps * len(f) / len(fragments[0]))
+        for f in fragments
+    ]
+    n = sum(len(f) for f in fragments)
+    fets = 0
+
+    def acaba(k: int) -> None:
+        nonlocal fets
+        fets += len(fragments[k])
+        if informa is not None:
+            informa(fets / n)
+
+    resultats: List[Optional[List[List[int]]]] = [None] * len(fragments)
+    if processos == 1 or len(fragments) == 1:
+        for k, (funcio, *args) in enumerate(tasques):
+            resultats[k] = funcio(*args)
+            acaba(k)
+    else:
+        for k, resultat in executa(tasques, processos):
+            resultats[k] = resultat
+            acaba(k)
+
+    equips = [[int(fragment[k]) for k in equip] for fragment, locals_ in zip(fragments, resultats) for equip in locals_]
+    equips.sort(key=min)
+    return equips
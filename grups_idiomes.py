@@ -0,0 +1,124 @@
+import heapq
+from typing import Dict, List, Optional, Sequence
+
+from caracteristiques import camp
+from restriccions import mascara_idiomes
+
+
+class AgrupadorIdiomes:
+    """
+    Reparte participantes en grupos que comparten al menos un idioma común.
+
+    Cada grupo guarda la intersección de los idiomas de sus miembros como máscara de bits y, para
+    cada idioma, hay un heap con los grupos abiertos que aún lo tienen en común. Colocar a alguien
+    solo mira los grupos de sus idiomas, no todos los miembros de todos los grupos.
+    """
+
+    def __init__(self, max_group_size: Optional[int] = None):
+        self.max_group_size = max_group_size
+        self.idiomes: Dict[str, int] = {}
+        self.grups: List[list] = []
+        self.interseccions: List[int] = []
+        self._per_idioma: Dict[int, List[int]] = {}
+        self._per_mida: List[tuple] = []
+
+    def _te_lloc(self, g: int) -> bool:
+        return self.max_group_size is None or len(self.grups[g]) < self.max_group_size
+
+    def _indexa(self, g: int) -> None:
+        if not self._te_lloc(g):
+            return
+        heapq.heappush(self._per_mida, (len(self.grups[g]), g))
+        mascara = self.interseccions[g]
+        while mascara:
+            bit = (mascara & -mascara).bit_length() - 1
+            heapq.heappush(self._per_idioma.setdefault(bit, []), g)
+            mascara &= mascara - 1
+
+    def mascara(self, participant) -> int:
+        return mascara_idiomes(self.idiomes, camp(participant, "preferred_languages"))
+
+    def afegeix_grup(self, membres: list) -> int:
+        """Añade un grupo ya formado (por ejemplo, de amigos) y devuelve su número."""
+        interseccio = -1
+        for p in membres:
+            interseccio &= self.mascara(p)
+        self.grups.append(list(membres))
+        self.interseccions.append(interseccio if membres else 0)
+        self._indexa(len(self.grups) - 1)
+        return len(self.grups) - 1
+
+    def primer_grup(self, mascara: int) -> Optional[int]:
+        """Primer grupo abierto (por orden de creación) que comparte algún idioma con `mascara`."""
+        millor = None
+        while mascara:
+            bit = (mascara & -mascara).bit_length() - 1
+            mascara &= mascara - 1
+            heap = self._per_idioma.get(bit)
+            # Los grupos llenos o que ya no comparten el idioma salen del heap al consultarlo
+            while heap and not (self._te_lloc(heap[0]) and self.interseccions[heap[0]] >> bit & 1):
+                heapq.heappop(heap)
+            if heap and (millor is None or heap[0] < millor):
+                millor = heap[0]
+        return millor
+
+    def col_loca(self, participant) -> int:
+        """Añade el participante al primer grupo compatible o abre uno nuevo."""
+        mascara = self.mascara(participant)
+        g = self.primer_grup(mascara)
+        if g is None:
+            return self.afegeix_grup([participant])
+
+        self.grups[g].append(participant)
+        self.interseccions[g] &= mascara
+        if self._te_lloc(g):
+            heapq.heappush(self._per_mida, (len(self.grups[g]), g))
+        return g
+
+    def col_loca_al_mes_petit(self, participant) -> int:
+        """Añade el participante (sin idiomas) al grupo abierto más pequeño."""
+        while self._per_mida:
+            mida, g = self._per_mida[0]
+            if mida == len(self.grups[g]) and self._te_lloc(g):
+                break
+            heapq.heappop(self._per_mida)
+        else:
+            self.grups.append([])
+            self.interseccions.append(0)
+            g = len(self.grups) - 1
+
+        self.grups[g].append(participant)
+        if self._te_lloc(g):
+            heapq.heappush(self._per_mida, (len(self.grups[g]), g))
+        return g
+
+
+def agrupa_per_idiomes(participants: Sequence, max_group_size: Optional[int] = None,
+                       grups_inicials: Sequence[list] = ()) -> List[list]:
+    """
+    Agrupa a los participantes en función de los idiomas que hablan, minimizando el número de grupos.
+    Los participantes sin idiomas se reparten después entre los grupos más pequeños.
+
+    Args:
+        participants (list): Participantes como diccionarios, dataclasses o filas de pandas.
+        max_group_size (int): Tamaño máximo de un grupo; None para no limitarlo.
+        grups_inicials (list): Grupos ya formados (p. ej. de amigos) que se completan primero.
+
+    Returns:
+        List[list]: Lista de grupos con los participantes.
+    """
+    agrupador = AgrupadorIdiomes(max_group_size)
+    for grup in grups_inicials:
+        agrupador.afegeix_grup(grup)
+
+    sense_idiomes = []
+    for participant in participants:
+        if camp(participant, "preferred_languages"):
+            agrupador.col_loca(participant)
+        else:
+            sense_idiomes.append(participant)
+
+    for participant in sense_idiomes:
+        agrupador.col_loca_al_mes_petit(participant)
+
+    return agrupador.grups
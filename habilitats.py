@@ -0,0 +1,181 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from dataclasses import dataclass
+
+# Vocabulario canónico de habilidades, por categorías (las mismas que program.skills.py)
+CATEGORIES = {
+    "core_tech": ["Python", "JavaScript", "TypeScript", "Java", "C++", "Rust", "Go", "HTML/CSS", "SQL",
+                  "Git/GitHub"],
+    "dev_platforms": ["React", "React Native", "Flutter", "Flask", "iOS Development", "Android Development",
+                      "Docker", "AWS/Azure/GCP", "PostgreSQL", "MongoDB", "Blockchain", "IoT"],
+    "ai_data": ["PyTorch", "TensorFlow", "Machine Learning", "Computer Vision", "Natural Language Processing",
+                "Data Analysis", "Data Visualization"],
+    "design": ["Figma", "UI/UX Design", "Agile Methodology"],
+}
+VOCABULARI = [skill for skills in CATEGORIES.values() for skill in skills]
+
+# Nombres alternativos (en minúsculas) que aparecen en los registros
+ALIES = {
+    "java script": "JavaScript",
+    "html": "HTML/CSS",
+    "css": "HTML/CSS",
+    "git": "Git/GitHub",
+    "github": "Git/GitHub",
+    "ios": "iOS Development",
+    "android": "Android Development",
+    "aws": "AWS/Azure/GCP",
+    "postgres": "PostgreSQL",
+    "ml": "Machine Learning",
+    "nlp": "Natural Language Processing",
+    "data": "Data Analysis",
+    "data analyss": "Data Analysis",
+    "ui/ux": "UI/UX Design",
+    "design": "UI/UX Design",
+    "agile": "Agile Methodology",
+}
+
+_canonics = {skill.casefold(): skill for skill in VOCABULARI}
+_canonics.update(ALIES)
+
+
+def canonicalitza(skill: str) -> str:
+    """Nombre canónico de una habilidad; las desconocidas se devuelven sin espacios sobrantes."""
+    net = " ".join(skill.split())
+    return _canonics.get(net.casefold(), net)
+
+
+@dataclass
+class MatriuHabilitats:
+    """
+    Matriz dispersa (CSR) participante × habilidad con los niveles. Las habilidades de la fila i
+    son indices[indptr[i]:indptr[i + 1]] con niveles nivells[indptr[i]:indptr[i + 1]].
+    Las columnas siguen `vocabulari`: primero VOCABULARI y después las habilidades desconocidas.
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+    nivells: np.ndarray
+    vocabulari: List[str]
+
+    @property
+    def forma(self) -> tuple:
+        return len(self.indptr) - 1, len(self.vocabulari)
+
+    def files(self) -> np.ndarray:
+        """Fila de cada valor guardado."""
+        return np.repeat(np.arange(self.forma[0]), np.diff(self.indptr))
+
+    def densa(self, dtype=np.float32) -> np.ndarray:
+        matriu = np.zeros(self.forma, dtype=dtype)
+        matriu[self.files(), self.indices] = self.nivells
+        return matriu
+
+    def mitjanes(self) -> np.ndarray:
+        """Nivel medio de cada participante (0 si no tiene habilidades)."""
+        recompte = np.diff(self.indptr)
+        suma = np.bincount(self.files(), weights=self.nivells, minlength=self.forma[0])
+        return np.divide(suma, recompte, out=np.zeros(self.forma[0]), where=recompte > 0)
+
+    def per_categoria(self) -> np.ndarray:
+        """Nivel máximo de cada participante en cada categoría de CATEGORIES (N × categorías)."""
+        categoria = np.full(self.forma[1], -1, dtype=np.int64)
+        for c, skills in enumerate(CATEGORIES.values()):
+            for skill in skills:
+                categoria[self.vocabulari.index(skill)] = c
+
+        resultat = np.zeros((self.forma[0], len(CATEGORIES)), dtype=self.nivells.dtype)
+        conegudes = categoria[self.indices] >= 0
+        np.maximum.at(resultat, (self.files()[conegudes], categoria[self.indices][conegudes]),
+                      self.nivells[conegudes])
+        return resultat
+
+    def producte_fila(self, i: int) -> np.ndarray:
+        """Producto escalar de los niveles del participante i con los de todos los demás."""
+        fila = np.zeros(self.forma[1], dtype=np.float64)
+        tros = slice(self.indptr[i], self.indptr[i + 1])
+        fila[self.indices[tros]] = self.nivells[tros]
+        return np.bincount(self.files(), weights=self.nivells * fila[self.indices], minlength=self.forma[0])
+
+    def similitud(self) -> np.ndarray:
+        """Similitud del coseno entre todos los participantes (N × N)."""
+        densa = self.densa(np.float64)
+        normes = np.linalg.norm(densa, axis=1)
+        densa /= np.where(normes > 0, normes, 1)[:, None]
+        return densa @ densa.T
+
+
+def nivells_canonics(skills: Optional[Dict[str, int]]) -> Dict[str, int]:
+    """{habilidad canónica: nivel}; si hay dos nombres de la misma habilidad, el nivel más alto."""
+    nivells: Dict[str, int] = {}
+    for skill, nivell in (skills if isinstance(skills, dict) else {}).items():
+        skill = canonicalitza(skill)
+        nivells[skill] = max(nivell, nivells.get(skill, nivell))
+    return nivells
+
+
+def matriu_habilitats(programming_skills: Iterable[Optional[Dict[str, int]]]) -> MatriuHabilitats:
+    """
+    Canonicaliza los nombres de las habilidades y construye la matriz dispersa de niveles.
+    Si un participante tiene dos nombres de la misma habilidad se queda con el nivel más alto.
+
+    Args:
+        programming_skills (iterable): Un diccionario {habilidad: nivel} por participante.
+
+    Returns:
+        MatriuHabilitats: Matriz CSR con el vocabulario canónico.
+    """
+    columnes = {skill: c for c, skill in enumerate(VOCABULARI)}
+    indptr, indices, nivells = [0], [], []
+
+    for skills in programming_skills:
+        fila = {columnes.setdefault(skill, len(columnes)): nivell
+                for skill, nivell in nivells_canonics(skills).items()}
+        for c in sorted(fila):
+            indices.append(c)
+            nivells.append(fila[c])
+        indptr.append(len(indices))
+
+    return MatriuHabilitats(
+        indptr=np.array(indptr, dtype=np.int64),
+        indices=np.array(indices, dtype=np.int32),
+        nivells=np.array(nivells, dtype=np.float32),
+        vocabulari=list(columnes),
+    )
+
+
+class PuntuadorHabilitats:
+    """
+    Versión vectorizada de `calculate_compatibility` (programming_skills.py) sobre una MatriuHabilitats.
+
+    Para cada habilidad común suma 10 - diferencia si la diferencia de nivel es como mucho 2 y
+    resta diferencia - 2 si no; además suma |A - C| · |B - C| por las habilidades complementarias,
+    donde C son las comunes. |C| es el producto escalar de las filas de presencia.
+    """
+
+    def __init__(self, matriu: MatriuHabilitats):
+        self.nivells = matriu.densa(np.float32)
+        self.presencia = np.zeros(matriu.forma, dtype=np.float32)
+        self.presencia[matriu.files(), matriu.indices] = 1
+        self.mides = np.diff(matriu.indptr).astype(np.float32)
+
+    def fila(self, i: int, candidats: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compatibilidad del participante i con cada candidato (todos si no se indican)."""
+        if candidats is None:
+            candidats = np.arange(len(self.mides))
+        comunes = self.presencia[candidats] * self.presencia[i]
+        diferencia = np.abs(self.nivells[candidats] - self.nivells[i])
+        solapament = (np.where(diferencia <= 2, 10 - diferencia, 2 - diferencia) * comunes).sum(axis=1)
+
+        c = self.presencia[candidats] @ self.presencia[i]
+        complementaries = (self.mides[candidats] - c) * (self.mides[i] - c)
+
+        return solapament + complementaries
+
+    def parella(self, i: int, j: int) -> float:
+        return float(self.fila(i, np.array([j]))[0])
+
+    def grup(self, candidats: np.ndarray, grup: Iterable[int]) -> np.ndarray:
+        """Suma de la compatibilidad de cada candidato con todos los miembros del grupo."""
+        total = np.zeros(len(candidats), dtype=np.float64)
+        for membre in grup:
+            total += self.fila(membre, candidats)
+        return total
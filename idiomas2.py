@@ -1,6 +1,9 @@
 import json
 from typing import List, Dict
 
+from grups_idiomes import agrupa_per_idiomes
+from carrega import carrega_df
+
 def find_groups(participants: List[Dict]) -> List[List[Dict]]:
     """
     Agrupa a los participantes en función de los idiomas que hablan, minimizando el número de grupos.
@@ -12,35 +15,7 @@ def find_groups(participants: List[Dict]) -> List[List[Dict]]:
     Returns:
         List[List[Dict]]: Lista de grupos con los participantes como diccionarios.
     """
-    final_groups = []
-
-    # Procesar participantes con idiomas
-    for participant in participants:
-        name = participant["name"]
-        languages = set(participant.get("preferred_languages", []))
-
-        if languages:
-            # Intentar añadir al participante a un grupo existente
-            for group in final_groups:
-                # Verificar si este participante comparte idiomas con todos los miembros del grupo
-                if all(languages & set(p.get("preferred_languages", [])) for p in group):
-                    group.append(participant)
-                    break
-            else:
-                # Si no es compatible con ningún grupo, crear uno nuevo
-                final_groups.append([participant])
-        else:
-            # Marcar participantes sin idiomas para procesar al final
-            participant["no_languages"] = True
-
-    # Procesar participantes sin idiomas
-    no_language_participants = [p for p in participants if p.get("no_languages")]
-    for participant in no_language_participants:
-        # Distribuir equitativamente entre los grupos más pequeños
-        smallest_group = min(final_groups, key=len)
-        smallest_group.append(participant)
-
-    return final_groups
+    return agrupa_per_idiomes(participants)
 
 # Cargar los datos desde el archivo JSON
 '''
@@ -97,12 +72,8 @@ def divide_by_skill(participants_df):
     return high_skill, mid_skill, low_skill
 
 def main():
-    # Cargar los datos desde el archivo JSON
-    with open("datathon_participants.json", "r") as file:
-        data = json.load(file)
-    
-    # Convertir los datos a un DataFrame
-    participants_df = pd.DataFrame(data)
+    # Cargar los datos (una sola lectura, con caché binaria)
+    participants_df = carrega_df("datathon_participants.json")
     
     # Dividir a los participantes según su habilidad
     high_skill, mid_skill, low_skill = divide_by_skill(participants_df)
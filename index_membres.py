@@ -0,0 +1,56 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+class IndexMembres:
+    """
+    Índice de participantes y equipos para la pestaña de búsqueda: nombre -> fila del DataFrame,
+    nombre -> equipo, y una lista ordenada de nombres normalizados para buscar por prefijo.
+    """
+
+    def __init__(self, df: pd.DataFrame, teams: List[dict]):
+        self.df = df
+        self.teams = teams
+        self.noms: List[str] = df["name"].tolist()
+
+        self.fila_de: Dict[str, int] = {}
+        for i, nom in enumerate(self.noms):
+            self.fila_de.setdefault(nom, i)
+
+        self.equip_de: Dict[str, int] = {}
+        for t, team in enumerate(teams or []):
+            for member in team["members"]:
+                self.equip_de.setdefault(member, t)
+
+        # (nombre normalizado, nombre) ordenado para búsquedas sin mayúsculas y por prefijo
+        self._ordenats = sorted((nom.casefold(), nom) for nom in self.fila_de)
+        self._claus = [clau for clau, _ in self._ordenats]
+
+    def cerca(self, text: str) -> Optional[str]:
+        """Nombre exacto del participante, sin distinguir mayúsculas; None si no existe."""
+        if text in self.fila_de:
+            return text
+        clau = text.strip().casefold()
+        i = bisect_left(self._claus, clau)
+        if i < len(self._claus) and self._claus[i] == clau:
+            return self._ordenats[i][1]
+        return None
+
+    def prefix(self, text: str, limit: int = 10) -> List[str]:
+        """Hasta `limit` nombres que empiezan por `text`, sin distinguir mayúsculas."""
+        clau = text.strip().casefold()
+        i = bisect_left(self._claus, clau)
+        resultat = []
+        while i < len(self._claus) and len(resultat) < limit and self._claus[i].startswith(clau):
+            resultat.append(self._ordenats[i][1])
+            i += 1
+        return resultat
+
+    def equip(self, nom: str) -> Optional[dict]:
+        t = self.equip_de.get(nom)
+        return None if t is None else self.teams[t]
+
+    def fila(self, nom: str) -> pd.Series:
+        return self.df.iloc[self.fila_de[nom]]
@@ -1,13 +1,11 @@
-import pandas as pd
+from carrega import carrega_df
+from habilitats import canonicalitza
 
-df = pd.read_json('datathon_participants.json')
+df = carrega_df('datathon_participants.json')
 
 
-# Alternative approach with steps broken out
-def get_lowercase_keys(d):
-    return {k.lower().strip() for k in d.keys() if k.lower().strip() not in ('ui/ux design', 'java script', 'html/css')}
+# Nombres canónicos de todas las habilidades (sin duplicados por mayúsculas o alias)
+unique_keys = {canonicalitza(k) for skills in df['programming_skills'] for k in skills}
 
-unique_keys = set().union(*df['programming_skills'].map(get_lowercase_keys))
 
-
-print(unique_keys)
\ No newline at end of file
+print(unique_keys)
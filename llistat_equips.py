@@ -0,0 +1,68 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+import equips
+
+TIERS = ["High", "Mid", "Low"]
+
+
+def taula_equips(df: pd.DataFrame, teams: List[dict]) -> pd.DataFrame:
+    """
+    Tabla con una fila por equipo para filtrar y paginar el listado sin recorrer los equipos.
+
+    Columnas: number, team_group, members (lista de nombres), names (nombres en minúsculas
+    separados por saltos de línea), languages (idiomas comunes a todos los miembros) y tier
+    (High/Mid/Low según el nivel medio del equipo, con los mismos terciles que divide_by_skill).
+    """
+    average = pd.Series(equips.skill_averages(df), index=df["name"]).groupby(level=0).first()
+    llengues = df.set_index("name")["preferred_languages"].groupby(level=0).first()
+
+    # Umbrales de los terciles de participantes, como en divide_by_skill
+    ordenats = np.sort(average.to_numpy())[::-1]
+    total = len(ordenats)
+    llindar_alt = ordenats[total // 3 - 1] if total >= 3 else np.inf
+    llindar_mig = ordenats[2 * total // 3 - 1] if total >= 3 else -np.inf
+
+    files = []
+    for i, team in enumerate(teams):
+        members = team["members"]
+        mitjana = average.reindex(members).mean()
+        comuns = None
+        for member in members:
+            valor = llengues.get(member)
+            # Sin `preferred_languages` en el registro, pandas deja NaN
+            propies = set(valor) if isinstance(valor, list) else set()
+            comuns = propies if comuns is None else comuns & propies
+        files.append({
+            "number": i + 1,
+            "team_group": team.get("team_group") or f"Team {i + 1}",
+            "members": members,
+            "names": "\n".join(members).casefold(),
+            "languages": sorted(comuns or []),
+            "tier": TIERS[0] if mitjana >= llindar_alt else TIERS[1] if mitjana >= llindar_mig else TIERS[2],
+        })
+
+    return pd.DataFrame(files, columns=["number", "team_group", "members", "names", "languages", "tier"])
+
+
+def filtra_equips(taula: pd.DataFrame, numero: Optional[int] = None, idioma: Optional[str] = None,
+                  tier: Optional[str] = None, nom: Optional[str] = None) -> pd.DataFrame:
+    """Filtra la tabla de equipos por número, idioma común, nivel o parte del nombre de un miembro."""
+    mascara = np.ones(len(taula), dtype=bool)
+    if numero is not None:
+        mascara &= (taula["number"] == numero).to_numpy()
+    if idioma:
+        mascara &= taula["languages"].map(lambda llengues: idioma in llengues).to_numpy()
+    if tier:
+        mascara &= (taula["tier"] == tier).to_numpy()
+    if nom:
+        mascara &= taula["names"].str.contains(nom.strip().casefold(), regex=False).to_numpy()
+    return taula[mascara]
+
+
+def pagina(taula: pd.DataFrame, numero: int, mida: int = 20) -> pd.DataFrame:
+    """Equipos de la página `numero` (empezando en 1)."""
+    inici = (numero - 1) * mida
+    return taula.iloc[inici:inici + mida]
@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from caracteristiques import ROLS, MatriuCaracteristiques, camp, codifica_participants
+from cerca_local import distancies_amb, encaixa, millora_equips
+from restriccions import Restriccions, mascara_idiomes
+
+
+def amplia_caracteristiques(caracteristiques: MatriuCaracteristiques, nous: Iterable,
+                            intencions: Optional[List[str]] = None) -> MatriuCaracteristiques:
+    """
+    Añade al final de la matriz las filas de los participantes nuevos, sin volver a codificar
+    (ni a clasificar el objetivo de) los que ya estaban. Las filas de los que se dan de baja se
+    quedan donde están, así que las posiciones no cambian.
+
+    Los códigos de rol de los nuevos se traducen al vocabulario de la matriz original.
+    """
+    nous = codifica_participants(nous, intencions)
+    vocabulari = list(caracteristiques.vocabulari_rols) or list(ROLS)
+    codis = {rol: c for c, rol in enumerate(vocabulari)}
+    for rol in nous.vocabulari_rols:
+        if rol not in codis:
+            codis[rol] = len(vocabulari)
+            vocabulari.append(rol)
+    traduccio = np.array([codis[rol] for rol in nous.vocabulari_rols], dtype=np.int16)
+
+    return MatriuCaracteristiques(
+        ids=caracteristiques.ids + nous.ids,
+        valors=np.concatenate([caracteristiques.valors, nous.valors]),
+        rols=np.concatenate([caracteristiques.rols, traduccio[nous.rols]]),
+        normes=np.concatenate([caracteristiques.normes, nous.normes]),
+        vocabulari_rols=vocabulari,
+    )
+
+
+def amplia_restriccions(restriccions: Restriccions, nous: Iterable, ids: Sequence[str],
+                        amics_externs: Optional[Dict[int, List[str]]] = None) -> Restriccions:
+    """
+    Añade al final las restricciones de los participantes nuevos sin volver a recorrer a los que
+    ya estaban: sus máscaras de idiomas (los idiomas nuevos reciben el siguiente bit), si han
+    registrado amigos y sus amistades, en los dos sentidos, con los de antes y entre ellos.
+
+    Args:
+        restriccions (Restriccions): Restricciones de la lista original.
+        nous (iterable): Participantes nuevos.
+        ids (list): Ids de la lista original, en orden (p. ej. `caracteristiques.ids`).
+        amics_externs (dict): Amigos registrados por los de antes que no estaban en la lista
+            (`TaulaParticipants.amics_externs`); sin ellos, solo cuentan las amistades que
+            registran los nuevos.
+
+    Returns:
+        Restriccions: Las mismas que daría `codifica_restriccions` con la lista entera.
+    """
+    n = len(restriccions)
+    idiomes = dict(restriccions.idiomes)
+    index_id = {str(id_): i for i, id_ in enumerate(ids)}
+    mascares, registrats = [], []
+    for p in nous:
+        index_id[str(camp(p, "id"))] = n + len(mascares)
+        mascares.append(mascara_idiomes(idiomes, camp(p, "preferred_languages")))
+        registrats.append(camp(p, "friend_registration") or [])
+
+    # Amistades nuevas: todas tienen al menos un participante nuevo, así que no repiten ninguna
+    parelles = set()
+    citats = [(n + k, amics) for k, amics in enumerate(registrats)] + list((amics_externs or {}).items())
+    for i, amics in citats:
+        for amic in amics:
+            j = index_id.get(str(amic))
+            if j is not None and j != i and max(i, j) >= n:
+                parelles.update([(i, j), (j, i)])
+    parelles = np.array(sorted(parelles), dtype=np.int64).reshape(-1, 2)
+
+    files = np.concatenate([np.repeat(np.arange(n), np.diff(restriccions.indptr)), parelles[:, 0]])
+    columnes = np.concatenate([restriccions.indices, parelles[:, 1]])
+    ordre = np.lexsort((columnes, files))
+    indptr = np.zeros(n + len(mascares) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(files, minlength=n + len(mascares)))
+
+    return Restriccions(
+        idiomes,
+        np.concatenate([restriccions.mascares, np.array(mascares, dtype=np.uint64)]),
+        np.concatenate([restriccions.te_amics, np.array([bool(amics) for amics in registrats], dtype=bool)]),
+        indptr,
+        columnes[ordre].astype(restriccions.indices.dtype),
+    )
+
+
+def actualitza_equips(equips: Sequence[Sequence[int]], caracteristiques: MatriuCaracteristiques,
+                      restriccions: Restriccions, afegits: Sequence[int] = (), retirats: Sequence[int] = (),
+                      max_team_size: int = 4, temps: float = 0.0,
+                      seed: int = 0) -> Tuple[List[List[int]], List[int]]:
+    """
+    Actualiza una asignación de equipos con inscripciones tardías y bajas sin rehacerla entera.
+
+    Los que se dan de baja salen de su equipo; si en un equipo queda una sola persona, vuelve a
+    colocarse como las nuevas. Cada participante a colocar va al equipo con plazas libres con el
+    que cumple las restricciones absolutas y suma más `compara`; si no hay ninguno, empieza un
+    equipo nuevo (en el hueco de uno vacío si lo hay). Con `temps` > 0 se aplica además
+    `cerca_local.millora_equips`, pero solo entre los equipos tocados. El resto no cambia.
+
+    Args:
+        equips (list): Equipos actuales como listas de posiciones.
+        caracteristiques (MatriuCaracteristiques): Matriz de todos los participantes, incluidos
+            los nuevos (ver `amplia_caracteristiques`).
+        restriccions (Restriccions): Restricciones de la misma lista (ver `amplia_restriccions`).
+        afegits (list): Posiciones de los participantes nuevos.
+        retirats (list): Posiciones de los que se dan de baja.
+        max_team_size (int): Tamaño máximo de un equipo.
+        temps (float): Segundos de búsqueda local entre los equipos tocados.
+        seed (int): Semilla de la búsqueda local.
+
+    Returns:
+        Tuple[List[List[int]], List[int]]: Los equipos, en las mismas posiciones que antes (los
+        que se quedan vacíos se devuelven como listas vacías y los nuevos van al final), y las
+        posiciones de los equipos que han cambiado.
+    """
+    equips = [list(map(int, equip)) for equip in equips]
+    equip_de = {i: t for t, equip in enumerate(equips) for i in equip}
+    tocats = set()
+
+    # Bajas
+    per_colocar = []
+    for i in retirats:
+        t = equip_de.pop(int(i), None)
+        if t is not None:
+            equips[t].remove(int(i))
+            tocats.add(t)
+    for t in sorted(tocats):
+        if len(equips[t]) == 1:
+            per_colocar.append(equips[t].pop())
+            del equip_de[per_colocar[-1]]
+
+    per_colocar += [int(i) for i in afegits if int(i) not in equip_de]
+    buits = [t for t, equip in enumerate(equips) if not equip]
+    oberts = {t for t, equip in enumerate(equips) if 0 < len(equip) < max_team_size}
+
+    # Altas y huérfanos: al equipo abierto compatible que más suma
+    for i in per_colocar:
+        millor, millor_suma = None, -np.inf
+        for t in sorted(oberts):
+            if encaixa(restriccions, i, equips[t]):
+                suma = distancies_amb(caracteristiques, i, equips[t]).sum()
+                if suma > millor_suma:
+                    millor, millor_suma = t, suma
+
+        if millor is None:
+            if buits:
+                millor = buits.pop(0)
+            else:
+                millor = len(equips)
+                equips.append([])
+
+        equips[millor].append(i)
+        equip_de[i] = millor
+        tocats.add(millor)
+        if len(equips[millor]) < max_team_size:
+            oberts.add(millor)
+        else:
+            oberts.discard(millor)
+
+    tocats = sorted(tocats)
+    if temps > 0 and len(tocats) > 1:
+        millorats = millora_equips([equips[t] for t in tocats], caracteristiques, restriccions, max_team_size,
+                                   temps=temps, seed=seed, conserva_buits=True)
+        for t, equip in zip(tocats, millorats):
+            equips[t] = equip
+
+    return equips, tocats
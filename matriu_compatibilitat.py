@@ -0,0 +1,85 @@
+import numpy as np
+from typing import Iterator, Optional, Tuple
+
+from caracteristiques import MatriuCaracteristiques, PENALITZACIO_ROL
+
+
+def _bloc(caracteristiques: MatriuCaracteristiques, files: slice, columnes: slice) -> np.ndarray:
+    """Puntuaciones de `compara` entre las filas y columnas indicadas (en float64)."""
+    valors = caracteristiques.valors
+    normes = caracteristiques.normes
+    rols = caracteristiques.rols
+
+    # |a - b|^2 = |a|^2 + |b|^2 - 2 a·b ; los valores son enteros, así que no hay error de redondeo
+    suma = normes[files, None] + normes[None, columnes] - 2 * (valors[files] @ valors[columnes].T)
+    np.maximum(suma, 0, out=suma)
+    suma += PENALITZACIO_ROL * (rols[files, None] != rols[None, columnes])
+
+    return np.sqrt(suma, out=suma)
+
+
+def blocs_compatibilitat(caracteristiques: MatriuCaracteristiques, block_size: int = 1024,
+                         dtype=np.float32) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Recorre la matriz N×N de `compara` por bloques de filas.
+
+    Args:
+        caracteristiques (MatriuCaracteristiques): Matriz devuelta por `codifica_participants`.
+        block_size (int): Número de filas de cada bloque; la memoria usada es block_size × N.
+        dtype: Tipo de los bloques devueltos.
+
+    Returns:
+        Iterator[Tuple[int, np.ndarray]]: Primera fila del bloque y el bloque (block_size × N).
+    """
+    n = len(caracteristiques)
+    for inici in range(0, n, block_size):
+        fi = min(inici + block_size, n)
+        yield inici, _bloc(caracteristiques, slice(inici, fi), slice(0, n)).astype(dtype, copy=False)
+
+
+def index_condensat(i, j, n: int):
+    """Posición de la pareja (i, j), con i < j, dentro de la matriz condensada."""
+    return i * (2 * n - i - 1) // 2 + (j - i - 1)
+
+
+def matriu_compatibilitat(caracteristiques: MatriuCaracteristiques, block_size: int = 1024,
+                          dtype=np.float32, condensada: bool = False,
+                          path: Optional[str] = None) -> np.ndarray:
+    """
+    Calcula la matriz completa de `compara` (incluida la penalización por rol) por bloques de filas.
+
+    Args:
+        caracteristiques (MatriuCaracteristiques): Matriz devuelta por `codifica_participants`.
+        block_size (int): Filas calculadas a la vez; limita la memoria temporal a block_size × N.
+        dtype: np.float32 (por defecto) o np.float64.
+        condensada (bool): Si es True devuelve solo el triángulo superior, en el orden de
+            `scipy.spatial.distance.pdist`, de longitud N(N-1)/2.
+        path (str): Si se indica, el resultado se escribe en un fichero .npy mapeado en memoria
+            en lugar de en RAM, para listas demasiado grandes.
+
+    Returns:
+        np.ndarray: Matriz N×N o vector condensado.
+    """
+    n = len(caracteristiques)
+    forma = (n * (n - 1) // 2,) if condensada else (n, n)
+    if path is not None:
+        resultat = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=forma)
+    else:
+        resultat = np.empty(forma, dtype=dtype)
+
+    for inici in range(0, n, block_size):
+        fi = min(inici + block_size, n)
+        if not condensada:
+            resultat[inici:fi] = _bloc(caracteristiques, slice(inici, fi), slice(0, n))
+            continue
+
+        # Solo hacen falta las columnas a la derecha de la diagonal
+        bloc = _bloc(caracteristiques, slice(inici, fi), slice(inici, n))
+        for fila in range(inici, fi):
+            desde = index_condensat(fila, fila + 1, n)
+            resultat[desde:desde + n - fila - 1] = bloc[fila - inici, fila - inici + 1:]
+
+    if path is not None:
+        resultat.flush()
+
+    return resultat
@@ -0,0 +1,224 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from caracteristiques import MatriuCaracteristiques
+from cerca_local import millora_equips, puntuacio_equips
+from restriccions import Restriccions
+
+# Arrays que se comparten con los procesos: nombre -> (objeto, atributo)
+_CAMPS = {
+    "valors": ("caracteristiques", "valors"),
+    "rols": ("caracteristiques", "rols"),
+    "normes": ("caracteristiques", "normes"),
+    "mascares": ("restriccions", "mascares"),
+    "te_amics": ("restriccions", "te_amics"),
+    "indptr": ("restriccions", "indptr"),
+    "indices": ("restriccions", "indices"),
+}
+
+# Procesos del pool compartido (ver `pool_processos`)
+MAX_PROCESSOS = os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Estado de cada proceso: los últimos bloques a los que se ha conectado y las matrices
+# reconstruidas sobre ellos
+_connexio: Optional[tuple] = None
+_blocs: List[shared_memory.SharedMemory] = []
+_caracteristiques: Optional[MatriuCaracteristiques] = None
+_restriccions: Optional[Restriccions] = None
+
+
+def pool_processos() -> ProcessPoolExecutor:
+    """
+    Pool de procesos compartido por todos los trabajos, con MAX_PROCESSOS procesos como máximo.
+    Se crea la primera vez y se reutiliza, así que cada trabajo no paga el arranque de los
+    procesos y varios trabajos a la vez no multiplican su número.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: los procesos no heredan los hilos del servidor web
+            _pool = ProcessPoolExecutor(max_workers=MAX_PROCESSOS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _descarta_pool(pool: ProcessPoolExecutor) -> None:
+    """Olvida un pool que se ha roto (p. ej. un proceso ha muerto) para que el siguiente trabajo cree otro."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def executa(tasques: List[tuple], processos: int) -> Iterator[Tuple[int, object]]:
+    """
+    Ejecuta las tareas (función, *args) en el pool compartido con `processos` a la vez como máximo.
+
+    Returns:
+        Iterator[Tuple[int, object]]: (posición de la tarea, resultado) a medida que terminan.
+    """
+    pool = pool_processos()
+    pendents = iter(enumerate(tasques))
+    en_curs = {}
+    try:
+        for k, (funcio, *args) in pendents:
+            en_curs[pool.submit(funcio, *args)] = k
+            if len(en_curs) >= processos:
+                break
+        while en_curs:
+            fets, _ = wait(en_curs, return_when=FIRST_COMPLETED)
+            for futur in fets:
+                k = en_curs.pop(futur)
+                yield k, futur.result()
+                for k, (funcio, *args) in pendents:
+                    en_curs[pool.submit(funcio, *args)] = k
+                    break
+    except BrokenProcessPool:
+        _descarta_pool(pool)
+        raise
+    finally:
+        for futur in en_curs:
+            futur.cancel()
+
+
+def comparteix(caracteristiques: MatriuCaracteristiques,
+               restriccions: Restriccions) -> Tuple[Dict[str, tuple], List[shared_memory.SharedMemory]]:
+    """
+    Copia las matrices de características y restricciones a bloques de memoria compartida.
+
+    Returns:
+        Tuple: Descripción de los bloques (nombre, forma y tipo de cada array, se puede enviar a
+        otro proceso) y los bloques, que hay que cerrar y borrar con `allibera`.
+    """
+    objectes = {"caracteristiques": caracteristiques, "restriccions": restriccions}
+    descripcio, blocs = {}, []
+    try:
+        for nom, (objecte, atribut) in _CAMPS.items():
+            array = np.ascontiguousarray(getattr(objectes[objecte], atribut))
+            bloc = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocs.append(bloc)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=bloc.buf)[...] = array
+            descripcio[nom] = (bloc.name, array.shape, array.dtype.str)
+    except BaseException:
+        allibera(blocs)
+        raise
+
+    return descripcio, blocs
+
+
+def allibera(blocs: List[shared_memory.SharedMemory]) -> None:
+    for bloc in blocs:
+        bloc.close()
+        bloc.unlink()
+
+
+def _desconnecta() -> None:
+    """Suelta las matrices y cierra los bloques a los que está conectado el proceso."""
+    global _connexio, _caracteristiques, _restriccions
+    _connexio = _caracteristiques = _restriccions = None
+    while _blocs:
+        _blocs.pop().close()
+
+
+atexit.register(_desconnecta)
+
+
+def _connecta(descripcio: Dict[str, tuple], ids: List[str], idiomes: Dict[str, int]) -> None:
+    """
+    Conecta el proceso a los bloques de `descripcio` sin copiarlos. Si ya lo estaba a los de otro
+    trabajo, primero los cierra; al terminar el proceso se cierran los últimos.
+
+    Los procesos (spawn) comparten el resource_tracker del principal, así que solo hay que
+    cerrar: el principal los borra una sola vez con `allibera`.
+    """
+    global _connexio, _caracteristiques, _restriccions
+    clau = tuple(nom_bloc for nom_bloc, _, _ in descripcio.values())
+    if clau == _connexio:
+        return
+    _desconnecta()
+
+    arrays = {}
+    for nom, (nom_bloc, forma, dtype) in descripcio.items():
+        bloc = shared_memory.SharedMemory(name=nom_bloc)
+        _blocs.append(bloc)
+        arrays[nom] = np.ndarray(forma, dtype=np.dtype(dtype), buffer=bloc.buf)
+
+    _caracteristiques = MatriuCaracteristiques(ids, arrays["valors"], arrays["rols"], arrays["normes"])
+    _restriccions = Restriccions(idiomes, arrays["mascares"], arrays["te_amics"], arrays["indptr"], arrays["indices"])
+    _connexio = clau
+
+
+def _inici(descripcio: Dict[str, tuple], ids: List[str], idiomes: Dict[str, int], seed: int, original: bool,
+           max_team_size: int, temps: float) -> Tuple[float, int, List[List[int]]]:
+    """Un arranque: orden aleatorio (o el de la lista), voraz y búsqueda local."""
+    from programa_definitiu import create_team_indices
+
+    _connecta(descripcio, ids, idiomes)
+    n = len(_caracteristiques)
+    ordre = np.arange(n) if original else np.random.default_rng(seed).permutation(n)
+    equips = create_team_indices(range(n), max_team_size, _caracteristiques, _restriccions, ordre=ordre)
+    if temps > 0:
+        equips = millora_equips(equips, _caracteristiques, _restriccions, max_team_size, temps=temps, seed=seed)
+
+    return puntuacio_equips(_caracteristiques, equips), seed, equips
+
+
+def forma_equips_multi(caracteristiques: MatriuCaracteristiques, restriccions: Restriccions,
+                       max_team_size: int = 4, inicis: Optional[int] = None, processos: Optional[int] = None,
+                       temps: float = 3.0, seed: int = 0,
+                       informa: Optional[Callable[[float], None]] = None) -> List[List[int]]:
+    """
+    Forma equipos varias veces en paralelo, con órdenes de entrada distintos, y se queda con la
+    asignación de mayor suma de `compara`.
+
+    Cada arranque ejecuta `create_team_indices` con un orden aleatorio y después
+    `cerca_local.millora_equips` durante `temps` segundos, en el pool de `pool_processos`. Las
+    matrices se copian una sola vez a memoria compartida y los procesos las leen desde allí, en
+    lugar de recibirlas en cada tarea.
+    El primer arranque usa el orden original, así que el resultado nunca es peor que el de una
+    sola pasada con la misma búsqueda local.
+
+    Args:
+        caracteristiques (MatriuCaracteristiques): Matriz devuelta por `codifica_participants`.
+        restriccions (Restriccions): Restricciones devueltas por `codifica_restriccions`.
+        max_team_size (int): Tamaño máximo de un equipo.
+        inicis (int): Número de arranques (por defecto, uno por proceso).
+        processos (int): Arranques a la vez como máximo (por defecto y como mucho, MAX_PROCESSOS).
+        temps (float): Segundos de búsqueda local en cada arranque (0 para no hacerla).
+        seed (int): Semilla del primer arranque; los demás usan seed + 1, seed + 2...
+        informa (callable): Recibe la fracción de arranques terminados cada vez que acaba uno.
+
+    Returns:
+        List[List[int]]: Los equipos como listas de posiciones.
+    """
+    processos = min(processos or MAX_PROCESSOS, MAX_PROCESSOS)
+    inicis = inicis or processos
+    seeds = [seed + k for k in range(inicis)]
+
+    descripcio, blocs = comparteix(caracteristiques, restriccions)
+    try:
+        ids = list(caracteristiques.ids)
+        tasques = [(_inici, descripcio, ids, restriccions.idiomes, s, k == 0, max_team_size, temps)
+                   for k, s in enumerate(seeds)]
+        resultats = []
+        for _, resultat in executa(tasques, processos):
+            resultats.append(resultat)
+            if informa is not None:
+                informa(len(resultats) / inicis)
+    finally:
+        allibera(blocs)
+
+    # Mayor puntuación; en caso de empate, la primera semilla
+    _, _, millors = max(resultats, key=lambda r: (r[0], -r[1]))
+    return millors
@@ -1,15 +1,20 @@
 import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 from dataclasses import dataclass
-from transformers import pipeline
+from classificador import classificador_ai
+from caracteristiques import MatriuCaracteristiques, camp, codifica_participants, distancies_fila
+from restriccions import Restriccions, codifica_restriccions, fila_compatibles, resol_grups_amics
+from grups_idiomes import agrupa_per_idiomes
+from taula_participants import TaulaParticipants, construeix_taula
+from carrega import carrega_participants
 from typing import Dict, List
 import uuid
 import json
 from math import sqrt
 from collections import defaultdict
 
-@dataclass
+@dataclass(slots=True)
 class Participant:
     id: uuid.UUID
     name: str
@@ -31,11 +36,12 @@ def check_absolute_restrictions(p1: Participant, p2: Participant) -> bool:
     Verifica las restricciones absolutas entre dos participantes
     Return: True si son compatibles, False si no lo son
     """
-    if not bool(set(p1.preferred_languages) and set(p2.preferred_languages)):
+    if not set(camp(p1, "preferred_languages") or []) & set(camp(p2, "preferred_languages") or []):
         return False
     
-
-    if not (p1.id in p2.friend_registration or p2.id in p1.friend_registration):
+    amics1 = camp(p1, "friend_registration") or []
+    amics2 = camp(p2, "friend_registration") or []
+    if (amics1 or amics2) and not (camp(p1, "id") in amics2 or camp(p2, "id") in amics1):
         return  False
     
     return True
@@ -55,36 +61,6 @@ def calculate_objective_score(p1: Participant) -> float:
     
 
 
-def classificador_ai(text: str) -> str:
-    '''
-    Dado un un texto devuelve la predicción de las intenciones de las personas.
-    Posibles etiquetas: socialize, learn, enjoy, win.
-    '''
-
-    clasificador = pipeline("zero-shot-classification", model="typeform/distilbert-base-uncased-mnli")
-
-    long_label = [
-        "I want to socialize or meet new people",
-        "I want to level up my programming skills",
-        "I want to have fun and enjoy",
-        "I want to win."
-    ]
-
-    short_label = [
-        "socialize",
-        "learn",
-        "enjoy",
-        "win"
-    ]
-
-    resultado = clasificador(text, candidate_labels=long_label)
-
-    mejor_equivalencia = resultado['labels'][0]
-    indice = long_label.index(mejor_equivalencia)
-    short_label = long_label[indice]
-
-    return short_label
-
 def calculate_role_score(p1: Participant) -> str:
     """Calcula la puntuación basada en roles preferidos (20%) - premia la diferencia"""
     return p1.preferred_role
@@ -164,97 +140,116 @@ def create_list_lenguages(participants: List[Dict], max_group_size: int = 4) ->
     Returns:
         List[List[Dict]]: Lista de grupos con los participantes como diccionarios.
     """
-    final_groups = create_list_friends(participants, max_group_size)
+    grups_amics, _ = resol_grups_amics(participants, max_group_size)
+    amb_amics = {i for grup in grups_amics for i in grup}
     
+    # Los participantes con los mismos idiomas se procesan seguidos, como antes
     language_groups = defaultdict(list)
+    for i, participant in enumerate(participants):
+        if i not in amb_amics:
+            language_groups[frozenset(participant.get("preferred_languages") or [])].append(participant)
     
-    for participant in participants:
-        languages = set(participant.get("preferred_languages", []))
-        if languages:
-            language_groups[frozenset(languages)].append(participant)
-    
-    for language_group in language_groups.values():
-        for participant in language_group:
-            added = False
-            for group in final_groups:
-                if all(languages & set(p.get("preferred_languages", [])) for p in group) and len(group) < max_group_size:
-                    group.append(participant)
-                    added = True
-                    break
-            
-            if not added:
-                if len(language_group) <= max_group_size:
-                    final_groups.append([participant])
-                else:
-                    subgroups = [language_group[i:i + max_group_size] for i in range(0, len(language_group), max_group_size)]
-                    final_groups.extend(subgroups)
-    
-    no_language_participants = [p for p in participants if not p.get("preferred_languages")]
-    for participant in no_language_participants:
-        smallest_group = min(final_groups, key=len)
-        if len(smallest_group) < max_group_size:
-            smallest_group.append(participant)
-        else:
-            for group in final_groups:
-                if len(group) < max_group_size:
-                    group.append(participant)
-                    break
-    
-    return final_groups
+    return agrupa_per_idiomes(
+        [p for language_group in language_groups.values() for p in language_group],
+        max_group_size,
+        grups_inicials=[[participants[i] for i in grup] for grup in grups_amics],
+    )
 
 def create_list_friends(participants: List[Participant], max_team_size: int = 4) -> List[List[Participant]]:
-    """Crea equipos optimizando la compatibilidad y respetando las restricciones"""
-    teams = []
-    unassigned = participants.copy()
-    
-    friend_groups = {}
-    for p in participants:
-        if p['friend_registration']:
-            group = set(p['id'])
-            group.update(p['friend_registration'])
-            key = tuple(sorted(group))
-            if key not in friend_groups:
-                friend_groups[key] = []
-            friend_groups[key].extend([p for p in participants if p['id'] in group])
-    
-    for group in friend_groups.values():
-        if len(group) <= max_team_size:
-            teams.append(group)
-            for p in group:
-                if p in unassigned:
-                    unassigned.remove(p)
+    """
+    Crea un equipo por cada grupo de amigos registrados (unidos de forma transitiva).
+    Los grupos con más de `max_team_size` personas no se devuelven; se pueden consultar con
+    `resol_grups_amics`.
+    """
+    grups, _ = resol_grups_amics(participants, max_team_size)
 
-    return teams     
+    return [[participants[i] for i in grup] for grup in grups]
 
-def create_teams(participants: List[Participant], max_team_size: int = 4) -> List[List[Participant]]: 
-    teams = []
-    unassigned = participants.copy()
+def create_teams(participants: List[Participant], max_team_size: int = 4,
+                 caracteristiques: Optional[MatriuCaracteristiques] = None,
+                 restriccions: Optional[Restriccions] = None,
+                 informa: Optional[Callable[[float], None]] = None) -> List[List[Participant]]: 
+    """
+    Crea equipos de forma voraz (ver `create_team_indices`) y los devuelve como listas de participantes.
+    """
+    if not hasattr(participants, "__getitem__"):
+        participants = construeix_taula(participants)
+    teams = create_team_indices(participants, max_team_size, caracteristiques, restriccions, informa)
 
-    while unassigned:
-        current_team = [unassigned.pop(0)]
-        
-        while len(current_team) < max_team_size and unassigned:
-            best_score = -1
-            best_candidate = None
-            
-            for candidate in unassigned:
-                compatible = all(check_absolute_restrictions(member, candidate) 
-                               for member in current_team)
-                
-                if compatible:
-                    avg_score = np.mean([calculate_compatibility_score(member, candidate) for member in current_team])
-                    
-                    if avg_score > best_score:
-                        best_score = avg_score
-                        best_candidate = candidate
-            
-            if best_candidate:
-                current_team.append(best_candidate)
-                unassigned.remove(best_candidate)
-            else:
+    return [[participants[i] for i in team] for team in teams]
+
+def create_team_indices(participants: List[Participant], max_team_size: int = 4,
+                        caracteristiques: Optional[MatriuCaracteristiques] = None,
+                        restriccions: Optional[Restriccions] = None,
+                        informa: Optional[Callable[[float], None]] = None,
+                        ordre: Optional[np.ndarray] = None) -> List[List[int]]:
+    """
+    Crea equipos de forma voraz: cada equipo empieza por el primer participante sin asignar y se
+    completa con el candidato compatible de mayor `compara` medio con los miembros actuales.
+
+    Los no asignados se guardan en un pool indexado (quitar uno es O(1)) y cada candidato lleva la
+    suma de su `compara` con el equipo actual, que se actualiza al añadir cada miembro. Las
+    restricciones absolutas se comprueban con máscaras de bits (ver restriccions.py).
+
+    `caracteristiques` y `restriccions` se calculan si no se pasan ya hechas; `informa` recibe
+    la fracción de participantes asignados después de cada equipo. Los equipos se devuelven como
+    listas de posiciones dentro de `participants` (se pueden mejorar con `cerca_local.millora_equips`).
+
+    `ordre` es una permutación de las posiciones que decide quién empieza cada equipo (por defecto
+    el orden de la lista); con órdenes aleatorios se obtienen asignaciones distintas.
+    """
+    if not hasattr(participants, "__getitem__"):
+        participants = construeix_taula(participants)
+    n = len(participants)
+    taula = isinstance(participants, TaulaParticipants)
+    if caracteristiques is None:
+        caracteristiques = participants.caracteristiques() if taula else codifica_participants(participants)
+    if restriccions is None:
+        restriccions = participants.restriccions() if taula else codifica_restriccions(participants)
+
+    pool = np.arange(n)
+    posicio = np.arange(n)
+    mida = n
+
+    def treu(i: int) -> None:
+        nonlocal mida
+        mida -= 1
+        ultim = pool[mida]
+        pool[posicio[i]] = ultim
+        posicio[ultim] = posicio[i]
+        posicio[i] = -1
+
+    teams = []
+    if ordre is None:
+        ordre = np.arange(n)
+    k = 0
+
+    while mida:
+        while posicio[ordre[k]] < 0:
+            k += 1
+        seguent = int(ordre[k])
+        treu(seguent)
+        current_team = [seguent]
+        suma = distancies_fila(caracteristiques, seguent)
+        compatible = fila_compatibles(restriccions, seguent)
+
+        while len(current_team) < max_team_size and mida:
+            candidats = pool[:mida]
+            candidats = candidats[compatible[candidats]]
+            if not len(candidats):
                 break
+
+            # El pool está desordenado por las eliminaciones: en caso de empate gana la posición más baja
+            puntuacions = suma[candidats]
+            best_candidate = candidats[puntuacions == puntuacions.max()].min()
+            current_team.append(best_candidate)
+            treu(best_candidate)
+            suma += distancies_fila(caracteristiques, best_candidate)
+            compatible &= fila_compatibles(restriccions, best_candidate)
         
-        teams.append(current_team)
+        teams.append([int(i) for i in current_team])
+        if informa is not None:
+            informa(1 - mida / n)
     
     return teams
 
@@ -269,8 +264,7 @@ def print_team_analysis(teams: List[List[Participant]]):
 
 def main() -> None:
   
-    with open("datathon_participants.json", "r") as file:
-        data = json.load(file)
+    data = carrega_participants("datathon_participants.json")
     
     groups_json = create_list_lenguages(data)
     
@@ -2,7 +2,7 @@ import numpy as np
 import pandas as pd
 from typing import List, Dict
 from dataclasses import dataclass
-from transformers import pipeline
+from classificador import classificador_ai
 from typing import Dict, List
 import uuid
 import json
@@ -55,36 +55,6 @@ def calculate_objective_score(p1: Participant) -> float:
     
 
 
-def classificador_ai(text: str) -> str:
-    '''
-    Dado un un texto devuelve la predicción de las intenciones de las personas.
-    Posibles etiquetas: socialize, learn, enjoy, win.
-    '''
-
-    clasificador = pipeline("zero-shot-classification", model="typeform/distilbert-base-uncased-mnli")
-
-    long_label = [
-        "I want to socialize or meet new people",
-        "I want to level up my programming skills",
-        "I want to have fun and enjoy",
-        "I want to win."
-    ]
-
-    short_label = [
-        "socialize",
-        "learn",
-        "enjoy",
-        "win"
-    ]
-
-    resultado = clasificador(text, candidate_labels=long_label)
-
-    mejor_equivalencia = resultado['labels'][0]
-    indice = long_label.index(mejor_equivalencia)
-    short_label = long_label[indice]
-
-    return short_label
-
 def calculate_role_score(p1: Participant) -> str:
     """Calcula la puntuación basada en roles preferidos (20%) - premia la diferencia"""
     return p1.preferred_role
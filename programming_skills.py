@@ -1,5 +1,9 @@
 from typing import List, Dict, Tuple
 
+import numpy as np
+
+from habilitats import PuntuadorHabilitats, matriu_habilitats, nivells_canonics
+
 # Clase para representar a un participante
 class Participant:
     def __init__(self, id: int, name: str, programming_skills: Dict[str, int]):
@@ -14,24 +18,25 @@ class Participant:
 # Función para calcular la compatibilidad entre dos participantes
 def calculate_compatibility(p1: Participant, p2: Participant) -> float:
     compatibility_score = 0
-    common_languages = set(p1.programming_skills.keys()) & set(p2.programming_skills.keys())
+    # Nombres canónicos (como habilitats.PuntuadorHabilitats): "java script" y "JavaScript" son el mismo
+    skills1 = nivells_canonics(p1.programming_skills)
+    skills2 = nivells_canonics(p2.programming_skills)
+    common_languages = set(skills1) & set(skills2)
     
     # Si tienen lenguajes en común, sumamos la compatibilidad en función de los niveles
     for lang in common_languages:
-        level_diff = abs(p1.programming_skills[lang] - p2.programming_skills[lang])
+        level_diff = abs(skills1[lang] - skills2[lang])
         if level_diff <= 2:
             compatibility_score += (10 - level_diff)  # Si la diferencia de nivel es baja, es más compatible
         else:
             compatibility_score -= (level_diff - 2)  # Si la diferencia es alta, se penaliza la compatibilidad
     
     # Buscamos lenguajes complementarios
-    unique_languages_p1 = set(p1.programming_skills.keys()) - common_languages
-    unique_languages_p2 = set(p2.programming_skills.keys()) - common_languages
+    unique_languages_p1 = set(skills1) - common_languages
+    unique_languages_p2 = set(skills2) - common_languages
     
-    for lang1 in unique_languages_p1:
-        for lang2 in unique_languages_p2:
-            # Complementariedad de habilidades
-            compatibility_score += 1  # Valor de compatibilidad por tener habilidades complementarias
+    # Complementariedad de habilidades: 1 por cada pareja (lang1, lang2) de lenguajes no comunes
+    compatibility_score += len(unique_languages_p1) * len(unique_languages_p2)
 
     return compatibility_score
 
@@ -50,26 +55,28 @@ def divide_by_skill(participants: List[Participant]) -> Tuple[List[Participant],
 # Función para optimizar compatibilidad dentro de un grupo
 def optimize_group(group: List[Participant]) -> List[Participant]:
     optimized_group = []
-    
-    while group:
-        if not optimized_group:
-            # Añadir el primer participante al grupo optimizado
-            optimized_group.append(group.pop(0))
-        else:
-            # Encontrar el participante más compatible con el grupo optimizado
-            best_match = None
-            best_score = float('-inf')
-            
-            for participant in group:
-                score = sum(calculate_compatibility(participant, g) for g in optimized_group)
-                if score > best_score:
-                    best_match = participant
-                    best_score = score
-            
-            # Añadir el participante más compatible al grupo optimizado
-            optimized_group.append(best_match)
-            group.remove(best_match)
-    
+    if not group:
+        return optimized_group
+
+    # Compatibilidad de todos los candidatos con un miembro a la vez (habilitats.PuntuadorHabilitats);
+    # la suma con el grupo optimizado se va acumulando en lugar de recalcularla en cada paso
+    puntuador = PuntuadorHabilitats(matriu_habilitats(p.programming_skills for p in group))
+    pendents = np.arange(1, len(group))
+    sumes = puntuador.fila(0, pendents).astype(np.float64)
+    optimized_group.append(group[0])
+
+    while len(pendents):
+        # Añadir el participante más compatible con el grupo optimizado (el primero en caso de empate)
+        millor = int(np.argmax(sumes))
+        escollit = pendents[millor]
+        optimized_group.append(group[escollit])
+
+        pendents = np.delete(pendents, millor)
+        sumes = np.delete(sumes, millor)
+        if len(pendents):
+            sumes += puntuador.fila(escollit, pendents)
+
+    group.clear()
     return optimized_group
 
 # Ejemplo de uso
@@ -0,0 +1,76 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from caracteristiques import PENALITZACIO_ROL, MatriuCaracteristiques
+from restriccions import Restriccions, fila_compatibles
+
+# Filas que se puntúan de una vez (acota la memoria temporal de cada consulta)
+BLOC = 16384
+
+
+class IndexRecomanacions:
+    """
+    Índice para recomendar compañeros: "los k participantes sin equipo con mayor `compara` con X
+    que cumplen las restricciones absolutas" (la misma puntuación que maximiza create_teams).
+
+    Guarda las características ponderadas en un array contiguo con la norma de cada fila, así que
+    `compara`² con todos es ||x||² + ||y||² - 2·x·y más la penalización de rol. La búsqueda es
+    por fuerza bruta en bloques de `block_size` filas, quedándose con los k mejores de cada uno.
+    """
+
+    def __init__(self, caracteristiques: MatriuCaracteristiques, restriccions: Restriccions,
+                 block_size: int = BLOC):
+        self.ids = caracteristiques.ids
+        self.valors = np.ascontiguousarray(caracteristiques.valors, dtype=np.float64)
+        self.normes = np.einsum("ij,ij->i", self.valors, self.valors)
+        self.rols = caracteristiques.rols
+        self.restriccions = restriccions
+        self.block_size = block_size
+        self.disponibles = np.ones(len(self.ids), dtype=bool)
+        self._posicio: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def posicio(self, id_: str) -> int:
+        if self._posicio is None:
+            self._posicio = {id_: i for i, id_ in enumerate(self.ids)}
+        return self._posicio[str(id_)]
+
+    def marca_assignats(self, posicions: Sequence[int], assignats: bool = True) -> None:
+        """Marca participantes como asignados (no se recomiendan) o los vuelve a dejar libres."""
+        self.disponibles[np.asarray(posicions, dtype=np.int64)] = not assignats
+
+    def recomana(self, i: int, k: int = 10, disponibles: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Los `k` participantes disponibles más compatibles con `i`. `disponibles` sustituye a la
+        máscara del índice (útil si el índice se comparte entre sesiones con equipos distintos).
+
+        Returns:
+            List[Tuple[int, float]]: (posición, `compara`) de mayor a menor puntuación; en caso de
+            empate, primero la posición más baja.
+        """
+        candidats = fila_compatibles(self.restriccions, i) & (self.disponibles if disponibles is None else disponibles)
+        candidats[i] = False
+        x = self.valors[i]
+
+        millors = np.empty(0, dtype=np.int64)
+        puntuacions = np.empty(0, dtype=np.float64)
+        for inici in range(0, len(self), self.block_size):
+            bloc = np.flatnonzero(candidats[inici:inici + self.block_size]) + inici
+            if not len(bloc):
+                continue
+            quadrats = self.normes[bloc] + self.normes[i] - 2 * (self.valors[bloc] @ x)
+            quadrats += PENALITZACIO_ROL * (self.rols[bloc] != self.rols[i])
+
+            millors = np.concatenate([millors, bloc])
+            puntuacions = np.concatenate([puntuacions, quadrats])
+            if len(millors) > k:
+                # Se queda con los que igualan o superan el k-ésimo, para desempatar al final
+                llindar = np.partition(puntuacions, len(puntuacions) - k)[len(puntuacions) - k] if k > 0 else np.inf
+                tria = puntuacions >= llindar
+                millors, puntuacions = millors[tria], puntuacions[tria]
+
+        ordre = np.lexsort((millors, -puntuacions))[:k]
+        return [(int(millors[j]), float(np.sqrt(max(puntuacions[j], 0.0)))) for j in ordre]
@@ -0,0 +1,204 @@
+import numpy as np
+from typing import Dict, Iterable, List, Sequence, Tuple
+from dataclasses import dataclass
+
+from caracteristiques import camp
+
+
+@dataclass
+class Restriccions:
+    idiomes: Dict[str, int]   # idioma -> bit dentro de la máscara
+    mascares: np.ndarray      # (N,) uint64 con un bit por idioma preferido
+    te_amics: np.ndarray      # (N,) True si el participante ha registrado amigos
+    indptr: np.ndarray        # amigos de i: indices[indptr[i]:indptr[i + 1]] (simétrico)
+    indices: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.mascares)
+
+    def amics(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+
+def mascara_idiomes(idiomes: Dict[str, int], llengues: Sequence[str]) -> int:
+    """Máscara de bits de una lista de idiomas; los idiomas nuevos reciben el siguiente bit libre."""
+    mascara = 0
+    for llengua in llengues or []:
+        if llengua not in idiomes:
+            if len(idiomes) >= 64:
+                raise ValueError("No caben más de 64 idiomas distintos en la máscara")
+            idiomes[llengua] = len(idiomes)
+        mascara |= 1 << idiomes[llengua]
+    return mascara
+
+
+def codifica_restriccions(participants: Iterable) -> Restriccions:
+    """
+    Codifica las restricciones absolutas de `check_absolute_restrictions`: los idiomas como
+    máscaras de bits y los amigos registrados como lista de adyacencia indexada por posición.
+    Recorre los participantes una sola vez, así que acepta también un iterador (para sacar
+    también las características del mismo iterador, usar `taula_participants.codifica`).
+
+    Args:
+        participants (iterable): Participantes como diccionarios, dataclasses o filas de pandas.
+
+    Returns:
+        Restriccions: Estructuras listas para comprobar parejas con operaciones de enteros.
+    """
+    idiomes: Dict[str, int] = {}
+    index_id: Dict[str, int] = {}
+    mascares, registrats = [], []
+    for i, p in enumerate(participants):
+        index_id[str(camp(p, "id"))] = i
+        mascares.append(mascara_idiomes(idiomes, camp(p, "preferred_languages")))
+        registrats.append(camp(p, "friend_registration") or [])
+    n = len(mascares)
+
+    # La relación de amistad cuenta en los dos sentidos, igual que en check_absolute_restrictions
+    veins: List[set] = [set() for _ in range(n)]
+    for i, amics in enumerate(registrats):
+        for amic in amics:
+            j = index_id.get(str(amic))
+            if j is not None and j != i:
+                veins[i].add(j)
+                veins[j].add(i)
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(v) for v in veins])
+    indices = np.fromiter((j for v in veins for j in sorted(v)), dtype=np.int64, count=indptr[-1])
+
+    return Restriccions(
+        idiomes,
+        np.array(mascares, dtype=np.uint64),
+        np.array([bool(amics) for amics in registrats], dtype=bool),
+        indptr,
+        indices,
+    )
+
+
+def son_compatibles(restriccions: Restriccions, i: int, j: int) -> bool:
+    """Versión con máscaras de `check_absolute_restrictions` para los participantes i y j."""
+    if not restriccions.mascares[i] & restriccions.mascares[j]:
+        return False
+    if restriccions.te_amics[i] or restriccions.te_amics[j]:
+        return j in restriccions.amics(i)
+    return True
+
+
+def fila_compatibles(restriccions: Restriccions, i: int) -> np.ndarray:
+    """Vector booleano con los participantes compatibles con `i` (i incluido si habla algún idioma)."""
+    fila = (restriccions.mascares & restriccions.mascares[i]) != 0
+
+    amics = np.zeros(len(restriccions), dtype=bool)
+    amics[restriccions.amics(i)] = True
+    amics[i] = True
+    if restriccions.te_amics[i]:
+        fila &= amics
+    else:
+        fila &= ~restriccions.te_amics | amics
+
+    return fila
+
+
+def matriu_compatibles(restriccions: Restriccions) -> np.ndarray:
+    """
+    Matriz N×N booleana con todas las parejas que cumplen las restricciones absolutas.
+    La diagonal indica si el participante tiene algún idioma.
+    """
+    n = len(restriccions)
+    mascares = restriccions.mascares
+    te_amics = restriccions.te_amics
+
+    amics = np.zeros((n, n), dtype=bool)
+    files = np.repeat(np.arange(n), np.diff(restriccions.indptr))
+    amics[files, restriccions.indices] = True
+    np.fill_diagonal(amics, True)
+
+    compatibles = (mascares[:, None] & mascares[None, :]) != 0
+    compatibles &= ~(te_amics[:, None] | te_amics[None, :]) | amics
+
+    return compatibles
+
+
+def subconjunt_restriccions(restriccions: Restriccions, posicions: np.ndarray) -> Restriccions:
+    """
+    Restricciones de los participantes `posicions`, renumerados 0..len(posicions) - 1.
+    Los amigos de fuera del subconjunto se descartan, pero `te_amics` se mantiene: quien ha
+    registrado amigos sigue sin poder ir con nadie más.
+    """
+    posicions = np.asarray(posicions, dtype=np.int64)
+    nou = np.full(len(restriccions), -1, dtype=np.int64)
+    nou[posicions] = np.arange(len(posicions))
+
+    indptr = np.zeros(len(posicions) + 1, dtype=np.int64)
+    indices = []
+    for k, i in enumerate(posicions):
+        amics = nou[restriccions.amics(i)]
+        amics = np.sort(amics[amics >= 0])
+        indices.append(amics)
+        indptr[k + 1] = indptr[k] + len(amics)
+
+    return Restriccions(
+        restriccions.idiomes,
+        restriccions.mascares[posicions],
+        restriccions.te_amics[posicions],
+        indptr,
+        np.concatenate(indices) if indices else np.empty(0, dtype=np.int64),
+    )
+
+
+class UnioConjunts:
+    """Estructura union-find con compresión de caminos y unión por tamaño."""
+
+    def __init__(self, n: int):
+        self.pare = list(range(n))
+        self.mida = [1] * n
+
+    def arrel(self, i: int) -> int:
+        while self.pare[i] != i:
+            self.pare[i] = self.pare[self.pare[i]]
+            i = self.pare[i]
+        return i
+
+    def uneix(self, i: int, j: int) -> None:
+        a, b = self.arrel(i), self.arrel(j)
+        if a == b:
+            return
+        if self.mida[a] < self.mida[b]:
+            a, b = b, a
+        self.pare[b] = a
+        self.mida[a] += self.mida[b]
+
+
+def resol_grups_amics(participants: Sequence, max_team_size: int = 4) -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Junta a los participantes que se han registrado como amigos, también de forma transitiva
+    (si A registra a B y B a C, los tres van juntos).
+
+    Args:
+        participants (list): Participantes como diccionarios, dataclasses o filas de pandas.
+        max_team_size (int): Tamaño máximo de un equipo.
+
+    Returns:
+        Tuple[List[List[int]], List[List[int]]]: Grupos de amigos que caben en un equipo y grupos
+        que superan `max_team_size`, como listas de posiciones dentro de `participants`.
+    """
+    participants = list(participants)
+    index_id = {str(camp(p, "id")): i for i, p in enumerate(participants)}
+    conjunts = UnioConjunts(len(participants))
+
+    for i, p in enumerate(participants):
+        for amic in camp(p, "friend_registration") or []:
+            j = index_id.get(str(amic))
+            if j is not None:
+                conjunts.uneix(i, j)
+
+    grups: Dict[int, List[int]] = {}
+    for i in range(len(participants)):
+        if conjunts.mida[conjunts.arrel(i)] > 1:
+            grups.setdefault(conjunts.arrel(i), []).append(i)
+
+    valids = [g for g in grups.values() if len(g) <= max_team_size]
+    massa_grans = [g for g in grups.values() if len(g) > max_team_size]
+
+    return valids, massa_grans
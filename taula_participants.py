@@ -0,0 +1,289 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
+
+from caracteristiques import (CURSOS, EXPERIENCIA, OBJECTIUS, PESOS, ROLS, MatriuCaracteristiques,
+                              camp)
+from classificador import classify_objectives
+from restriccions import Restriccions, mascara_idiomes
+
+
+def _bits(mascara: int) -> List[int]:
+    bits = []
+    while mascara:
+        bits.append((mascara & -mascara).bit_length() - 1)
+        mascara &= mascara - 1
+    return bits
+
+
+@dataclass
+class TaulaParticipants:
+    """
+    Participantes guardados por columnas: los campos categóricos como códigos enteros (con su
+    vocabulario), idiomas y disponibilidad como máscaras de bits, y los amigos como posiciones
+    enteras en lugar de UUIDs. `ids` guarda el UUID original de cada posición.
+
+    `caracteristiques()` y `restriccions()` dan lo mismo que `codifica_participants` y
+    `codifica_restriccions` sobre los registros originales.
+    """
+    ids: List[str]
+    noms: List[str]
+    objectius: List[str]
+    year_of_study: np.ndarray        # int8, índice en vocabularis["year_of_study"]
+    experience_level: np.ndarray     # int8
+    preferred_role: np.ndarray       # int8
+    hackathons_done: np.ndarray      # int16
+    preferred_team_size: np.ndarray  # int8
+    disponibilitat: np.ndarray       # uint32, un bit por franja de vocabularis["availability"]
+    idiomes: np.ndarray              # uint64, un bit por idioma de vocabularis["preferred_languages"]
+    amics_indptr: np.ndarray         # amigos registrados de i: amics_indices[indptr[i]:indptr[i + 1]]
+    amics_indices: np.ndarray        # int32
+    registra_amics: np.ndarray       # bool, True si registró algún amigo (aunque no esté en la lista)
+    amics_externs: Dict[int, List[str]]  # amigos registrados que no están en la lista, por posición
+    habilitats_indptr: np.ndarray    # habilidades de i: habilitats_indices[indptr[i]:indptr[i + 1]]
+    habilitats_indices: np.ndarray   # int32, índice en vocabularis["programming_skills"]
+    habilitats_nivells: np.ndarray   # int8
+    vocabularis: Dict[str, List[str]]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> "ParticipantCompacte":
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return ParticipantCompacte(self, i % len(self))
+
+    def __iter__(self):
+        return (ParticipantCompacte(self, i) for i in range(len(self)))
+
+    def caracteristiques(self, intencions: Optional[List[str]] = None) -> MatriuCaracteristiques:
+        """Equivalente de `codifica_participants` calculado directamente sobre las columnas."""
+        if intencions is None:
+            intencions = classify_objectives(self.objectius)
+
+        def valors_de(columna: str, escala: Dict[str, int]) -> np.ndarray:
+            return np.array([escala[v] for v in self.vocabularis[columna]], dtype=np.float64)
+
+        disponibles = np.array([bin(int(m)).count("1") for m in self.disponibilitat], dtype=np.float64)
+        valors = np.column_stack([
+            [OBJECTIUS.get(intencio, 4) for intencio in intencions],
+            valors_de("experience_level", EXPERIENCIA)[self.experience_level],
+            self.hackathons_done,
+            valors_de("year_of_study", CURSOS)[self.year_of_study],
+            disponibles,
+            self.preferred_team_size,
+        ]).astype(np.float64) * PESOS
+
+        # Mismos códigos de rol que codifica_participants: primero ROLS y luego los nuevos
+        codis_rol = {rol: i for i, rol in enumerate(ROLS)}
+        recodifica = np.array([codis_rol.setdefault(r, len(codis_rol)) for r in self.vocabularis["preferred_role"]],
+                              dtype=np.int16)
+
+        return MatriuCaracteristiques(
+            ids=self.ids,
+            valors=valors,
+            rols=recodifica[self.preferred_role],
+            normes=np.einsum("ij,ij->i", valors, valors),
+            vocabulari_rols=list(codis_rol),
+        )
+
+    def restriccions(self) -> Restriccions:
+        """Equivalente de `codifica_restriccions` calculado directamente sobre las columnas."""
+        n = len(self)
+        files = np.repeat(np.arange(n), np.diff(self.amics_indptr))
+        columnes = self.amics_indices.astype(np.int64)
+        valides = files != columnes
+
+        # Amistad simétrica y sin repetidos, ordenada por fila
+        parelles = np.unique(np.concatenate([
+            np.stack([files[valides], columnes[valides]], axis=1),
+            np.stack([columnes[valides], files[valides]], axis=1),
+        ]), axis=0) if valides.any() else np.empty((0, 2), dtype=np.int64)
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(indptr, parelles[:, 0] + 1, 1)
+
+        return Restriccions(
+            idiomes={idioma: i for i, idioma in enumerate(self.vocabularis["preferred_languages"])},
+            mascares=self.idiomes.copy(),
+            te_amics=self.registra_amics.copy(),
+            indptr=np.cumsum(indptr),
+            indices=parelles[:, 1].copy(),
+        )
+
+
+class ParticipantCompacte:
+    """
+    Vista de un participante de una TaulaParticipants, con los mismos atributos que `Participant`.
+    Solo guarda la tabla y la posición (__slots__), así que crearla no copia nada.
+    """
+    __slots__ = ("taula", "index")
+
+    def __init__(self, taula: TaulaParticipants, index: int):
+        self.taula = taula
+        self.index = index
+
+    def _categoria(self, columna: str) -> str:
+        return self.taula.vocabularis[columna][getattr(self.taula, columna)[self.index]]
+
+    @property
+    def id(self) -> str:
+        return self.taula.ids[self.index]
+
+    @property
+    def name(self) -> str:
+        return self.taula.noms[self.index]
+
+    @property
+    def objective(self) -> str:
+        return self.taula.objectius[self.index]
+
+    @property
+    def year_of_study(self) -> str:
+        return self._categoria("year_of_study")
+
+    @property
+    def experience_level(self) -> str:
+        return self._categoria("experience_level")
+
+    @property
+    def preferred_role(self) -> str:
+        return self._categoria("preferred_role")
+
+    @property
+    def hackathons_done(self) -> int:
+        return int(self.taula.hackathons_done[self.index])
+
+    @property
+    def preferred_team_size(self) -> int:
+        return int(self.taula.preferred_team_size[self.index])
+
+    @property
+    def availability(self) -> Dict[str, bool]:
+        mascara = int(self.taula.disponibilitat[self.index])
+        return {franja: bool(mascara >> bit & 1) for bit, franja in enumerate(self.taula.vocabularis["availability"])}
+
+    @property
+    def preferred_languages(self) -> List[str]:
+        vocabulari = self.taula.vocabularis["preferred_languages"]
+        return [vocabulari[bit] for bit in _bits(int(self.taula.idiomes[self.index]))]
+
+    @property
+    def friend_registration(self) -> List[str]:
+        t = self.taula
+        amics = [t.ids[j] for j in t.amics_indices[t.amics_indptr[self.index]:t.amics_indptr[self.index + 1]]]
+        return amics + t.amics_externs.get(self.index, [])
+
+    @property
+    def programming_skills(self) -> Dict[str, int]:
+        t = self.taula
+        tros = slice(t.habilitats_indptr[self.index], t.habilitats_indptr[self.index + 1])
+        vocabulari = t.vocabularis["programming_skills"]
+        return {vocabulari[s]: int(nivell) for s, nivell in zip(t.habilitats_indices[tros], t.habilitats_nivells[tros])}
+
+    def __repr__(self) -> str:
+        return f"ParticipantCompacte({self.name!r})"
+
+
+def construeix_taula(participants: Iterable) -> TaulaParticipants:
+    """
+    Construye la tabla compacta recorriendo los participantes una sola vez (acepta iteradores,
+    p. ej. `carrega.llegeix_participants(path, CAMPS_EQUIPS)`).
+    """
+    columnes_categoriques = ["year_of_study", "experience_level", "preferred_role"]
+    codis: Dict[str, Dict[str, int]] = {c: {} for c in columnes_categoriques}
+    codis["year_of_study"].update({v: i for i, v in enumerate(CURSOS)})
+    codis["experience_level"].update({v: i for i, v in enumerate(EXPERIENCIA)})
+    codis["preferred_role"].update({v: i for i, v in enumerate(ROLS)})
+    franges: Dict[str, int] = {}
+    idiomes: Dict[str, int] = {}
+    habilitats: Dict[str, int] = {}
+
+    ids, noms, objectius, categories, enters = [], [], [], [], []
+    disponibilitat, mascares, amics_crus = [], [], []
+    habilitats_indptr, habilitats_indices, habilitats_nivells = [0], [], []
+
+    for p in participants:
+        ids.append(str(camp(p, "id")))
+        noms.append(camp(p, "name"))
+        objectius.append(camp(p, "objective") or "")
+        categories.append([codis[c].setdefault(camp(p, c), len(codis[c])) for c in columnes_categoriques])
+        enters.append((camp(p, "hackathons_done") or 0, camp(p, "preferred_team_size") or 0))
+
+        mascara = 0
+        for franja, disponible in (camp(p, "availability") or {}).items():
+            bit = franges.setdefault(franja, len(franges))
+            if disponible:
+                mascara |= 1 << bit
+        disponibilitat.append(mascara)
+
+        mascares.append(mascara_idiomes(idiomes, camp(p, "preferred_languages")))
+        amics_crus.append([str(a) for a in camp(p, "friend_registration") or []])
+
+        for skill, nivell in (camp(p, "programming_skills") or {}).items():
+            habilitats_indices.append(habilitats.setdefault(skill, len(habilitats)))
+            habilitats_nivells.append(nivell)
+        habilitats_indptr.append(len(habilitats_indices))
+
+    if len(franges) > 32:
+        raise ValueError("No caben más de 32 franjas de disponibilidad en la máscara")
+
+    # Los amigos pasan de UUID a posición; los que no están en la lista se guardan aparte
+    index_id = {id_: i for i, id_ in enumerate(ids)}
+    amics = [[index_id[a] for a in llista if a in index_id] for llista in amics_crus]
+    amics_externs = {}
+    for i, llista in enumerate(amics_crus):
+        externs = [a for a in llista if a not in index_id]
+        if externs:
+            amics_externs[i] = externs
+    amics_indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    amics_indptr[1:] = np.cumsum([len(llista) for llista in amics])
+
+    categories = np.array(categories, dtype=np.int8).reshape(len(ids), len(columnes_categoriques))
+    enters = np.array(enters, dtype=np.int64).reshape(len(ids), 2)
+
+    return TaulaParticipants(
+        ids=ids,
+        noms=noms,
+        objectius=objectius,
+        year_of_study=categories[:, 0].copy(),
+        experience_level=categories[:, 1].copy(),
+        preferred_role=categories[:, 2].copy(),
+        hackathons_done=enters[:, 0].astype(np.int16),
+        preferred_team_size=enters[:, 1].astype(np.int8),
+        disponibilitat=np.array(disponibilitat, dtype=np.uint32),
+        idiomes=np.array(mascares, dtype=np.uint64),
+        amics_indptr=amics_indptr,
+        amics_indices=np.fromiter((j for llista in amics for j in llista), dtype=np.int32, count=amics_indptr[-1]),
+        registra_amics=np.array([bool(llista) for llista in amics_crus], dtype=bool),
+        amics_externs=amics_externs,
+        habilitats_indptr=np.array(habilitats_indptr, dtype=np.int64),
+        habilitats_indices=np.array(habilitats_indices, dtype=np.int32),
+        habilitats_nivells=np.array(habilitats_nivells, dtype=np.int8),
+        vocabularis={
+            "year_of_study": list(codis["year_of_study"]),
+            "experience_level": list(codis["experience_level"]),
+            "preferred_role": list(codis["preferred_role"]),
+            "availability": list(franges),
+            "preferred_languages": list(idiomes),
+            "programming_skills": list(habilitats),
+        },
+    )
+
+
+def codifica(participants: Iterable,
+             intencions: Optional[List[str]] = None) -> Tuple[MatriuCaracteristiques, Restriccions]:
+    """
+    Características y restricciones de los participantes recorriéndolos una sola vez (a
+    diferencia de llamar a `codifica_participants` y `codifica_restriccions`, que consumen cada
+    una el iterador).
+
+    Args:
+        participants (iterable): Participantes (lista, iterador o tabla ya construida).
+        intencions (list): Etiqueta de cada objetivo; si es None se clasifican.
+
+    Returns:
+        Tuple[MatriuCaracteristiques, Restriccions]: Lo mismo que las dos funciones por separado.
+    """
+    taula = participants if isinstance(participants, TaulaParticipants) else construeix_taula(participants)
+    return taula.caracteristiques(intencions), taula.restriccions()
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from carrega import carrega_pujada
+
+ETAPES = ["load", "classify", "score", "assign", "improve"]
+
+# Segundos que se dedican a mejorar los equipos con búsqueda local
+TEMPS_MILLORA = 3.0
+
+# Número máximo de trabajos terminados que se guardan
+MAX_TREBALLS = 32
+
+
+@dataclass
+class Treball:
+    id: str
+    clau: tuple
+    etapa: str = "pending"
+    progres: float = 0.0
+    error: Optional[str] = None
+    resultat: Optional[list] = None
+    creat: float = field(default_factory=time.time)
+    future: Optional[Future] = None
+
+    @property
+    def acabat(self) -> bool:
+        return self.etapa in ("done", "error")
+
+    def informa(self, etapa: str, fraccio: float = 0.0) -> None:
+        """Actualiza la etapa actual y el progreso global (cada etapa pesa lo mismo)."""
+        self.etapa = etapa
+        self.progres = (ETAPES.index(etapa) + min(max(fraccio, 0.0), 1.0)) / len(ETAPES)
+
+
+_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="equips")
+_treballs: Dict[str, Treball] = {}
+_per_clau: Dict[tuple, str] = {}
+_lock = threading.Lock()
+
+
+def _executa(treball: Treball, funcio: Callable, args: tuple) -> None:
+    try:
+        treball.resultat = funcio(*args, informa=treball.informa)
+        treball.etapa = "done"
+        treball.progres = 1.0
+    except Exception as e:
+        treball.error = str(e)
+        treball.etapa = "error"
+
+
+def _neteja() -> None:
+    acabats = sorted((t for t in _treballs.values() if t.acabat), key=lambda t: t.creat)
+    for treball in acabats[:max(0, len(acabats) - MAX_TREBALLS)]:
+        del _treballs[treball.id]
+        _per_clau.pop(treball.clau, None)
+
+
+def llança(clau: tuple, funcio: Callable, *args) -> str:
+    """
+    Ejecuta `funcio(*args, informa=...)` en segundo plano y devuelve el identificador del trabajo.
+    Si ya hay un trabajo con la misma clave (mismo fichero y parámetros) se reutiliza.
+    """
+    with _lock:
+        existent = _per_clau.get(clau)
+        if existent in _treballs and _treballs[existent].etapa != "error":
+            return existent
+
+        _neteja()
+        treball = Treball(id=uuid.uuid4().hex, clau=clau)
+        _treballs[treball.id] = treball
+        _per_clau[clau] = treball.id
+        treball.future = _executor.submit(_executa, treball, funcio, args)
+
+    return treball.id
+
+
+def estat(id_treball: str) -> Optional[Treball]:
+    """Devuelve el trabajo (con su etapa, progreso y resultado) o None si ya no existe."""
+    return _treballs.get(id_treball)
+
+
+def equips_json(equips: list) -> list:
+    """Convierte una lista de equipos de participantes a la estructura team_group/members de equips.py."""
+    return [
+        {"team_group": f"Team {i + 1}", "members": [p["name"] for p in equip]}
+        for i, equip in enumerate(equips)
+    ]
+
+
+def forma_equips_per_habilitat(contingut: bytes, max_team_size: int, informa: Callable) -> list:
+    """Equipos por nivel de habilidad (equips.py), informando de cada etapa."""
+    import equips
+
+    informa("load")
+    df = carrega_pujada(contingut).df
+    informa("classify", 1.0)
+    informa("score")
+    assignments = equips.assign_teams_by_skill(df, max_team_size)
+    informa("assign")
+
+    return equips.teams_from_assignments(df, assignments)
+
+
+def forma_equips_per_compatibilitat(contingut: bytes, max_team_size: int, informa: Callable) -> list:
+    """
+    Equipos por compatibilidad (`compara` y restricciones absolutas), mejorados durante
+    TEMPS_MILLORA segundos con búsqueda local (con varios arranques en paralelo si hay más de un
+    núcleo, o por fragmentos de idiomas si la lista es grande), informando de cada etapa.
+    """
+    from classificador import classify_objectives
+    from cerca_local import millora_equips
+    from fragments import MIDA_FRAGMENT, forma_equips_per_fragments
+    from multi_inici import forma_equips_multi
+    from taula_participants import construeix_taula
+    import programa_definitiu
+
+    informa("load")
+    participants = carrega_pujada(contingut).participants
+    taula = construeix_taula(participants)
+
+    informa("classify")
+    intencions = classify_objectives(taula.objectius)
+
+    informa("score")
+    caracteristiques = taula.caracteristiques(intencions)
+    restriccions = taula.restriccions()
+
+    if len(participants) > MIDA_FRAGMENT:
+        # Listas grandes: cada grupo de idiomas por separado y en paralelo (voraz y mejora juntos)
+        informa("assign")
+        equips = forma_equips_per_fragments(
+            caracteristiques, restriccions, max_team_size, temps=TEMPS_MILLORA,
+            informa=lambda fraccio: informa("assign", fraccio),
+        )
+        informa("improve", 1.0)
+    elif (os.cpu_count() or 1) > 1:
+        # Varios arranques en paralelo en el mismo tiempo que uno solo
+        informa("assign")
+        equips = forma_equips_multi(
+            caracteristiques, restriccions, max_team_size, temps=TEMPS_MILLORA,
+            informa=lambda fraccio: informa("assign", fraccio),
+        )
+        informa("improve", 1.0)
+    else:
+        informa("assign")
+        equips = programa_definitiu.create_team_indices(
+            participants, max_team_size, caracteristiques, restriccions,
+            informa=lambda fraccio: informa("assign", fraccio),
+        )
+
+        informa("improve")
+        equips = millora_equips(
+            equips, caracteristiques, restriccions, max_team_size, temps=TEMPS_MILLORA,
+            informa=lambda fraccio: informa("improve", fraccio),
+        )
+
+    return equips_json([[participants[i] for i in equip] for equip in equips])
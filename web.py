@@ -1,14 +1,118 @@
 import streamlit as st
 import matplotlib.pyplot as plt
 import random
-import pandas as pd
-import equips
+import hashlib
+import io
+import time
+import treballs
+import carrega
+import agregats
+import llistat_equips
+from index_membres import IndexMembres
+from recomanacions import IndexRecomanacions
+from taula_participants import codifica, construeix_taula
+from classificador import consulta_cache
+import numpy as np
 
 st.set_page_config(page_title="Group Generator", layout="centered", page_icon="👤")
 
 st.title("Team Generator for the Datathon FME")
 st.write("Welcome to our interactive tool for team formation.")
 
+MAX_TEAM_SIZE = 4
+
+# Caché compartida entre sesiones, indexada por el hash del fichero subido
+@st.cache_resource(max_entries=8, show_spinner=False)
+def llegeix_participants(digest, _contingut):
+    return carrega.carrega_pujada(_contingut).df
+
+METODES = {
+    "Skill level": treballs.forma_equips_per_habilitat,
+    "Compatibility (AI objectives)": treballs.forma_equips_per_compatibilitat,
+}
+
+@st.cache_resource(show_spinner=False)
+def versions_etiquetes():
+    """Versión de las etiquetas de objetivos de cada fichero (digest -> int), compartida entre sesiones.
+    Sube cuando termina un trabajo del fichero, que puede haber clasificado objetivos nuevos."""
+    return {}
+
+def versio_etiquetes(digest):
+    return versions_etiquetes().get(digest, 0)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def agregats_roster(digest, versio, _df):
+    return agregats.calcula_agregats(_df)
+
+def grafic(x, y, title, xlabel="", small=False, rotation=0, bar=True):
+    """Dibuja un gráfico de barras (o histograma) y lo devuelve como PNG."""
+    fig, ax = plt.subplots(figsize=(4, 2) if small else (4, 3))
+    if bar:
+        ax.bar(x, y, color='#189578')
+    else:
+        ax.hist(y, bins=x, color='#189578')
+    ax.set_title(title, fontsize=6 if small else 10)
+    ax.set_xlabel(xlabel, fontsize=6)
+    ax.set_ylabel("Number of Participants", fontsize=6)
+    if rotation:
+        ax.tick_params(axis='x', rotation=rotation)
+    if small:
+        ax.tick_params(axis='both', labelsize=6)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def grafics_roster(digest, versio, _agregats):
+    return {
+        "experience": grafic(_agregats.experience.index, _agregats.experience.values,
+                             "Experience Level of Participants", "Experience Level"),
+        "years": grafic(_agregats.years.index, _agregats.years.values,
+                        "Year of Study of Participants", "Year of Study", rotation=45),
+        "objectives": grafic([o.capitalize() for o in _agregats.objectives], list(_agregats.objectives.values()),
+                             "Objectives of the Participants", small=True),
+        "skills": grafic(20, _agregats.average_skill, "Average Skill Level of Participants",
+                         "Average skill level", bar=False),
+    }
+
+def index_actual():
+    """Índice de búsqueda de la sesión; se reconstruye solo cuando cambian los datos o los equipos."""
+    index = st.session_state.get("index")
+    if index is None or index.df is not st.session_state.df or index.teams is not st.session_state.get("teams"):
+        index = IndexMembres(st.session_state.df, st.session_state.get("teams"))
+        st.session_state.index = index
+    return index
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def index_recomanacions(digest, versio, _contingut):
+    # Los registros tal cual (como en treballs): un campo que falta es None, no NaN del DataFrame
+    taula = construeix_taula(carrega.carrega_pujada(_contingut).participants)
+    # Sin ejecutar el modelo: los objetivos que aún no están en la caché cuentan como "win"
+    etiquetes = consulta_cache(taula.objectius)
+    intencions = [etiquetes.get(objectiu, "win") for objectiu in taula.objectius]
+    return IndexRecomanacions(*codifica(taula, intencions))
+
+def disponibles_actuals(index):
+    """Participantes sin equipo en la sesión; se recalcula solo cuando cambian los equipos."""
+    if st.session_state.get("disponibles_teams") is not st.session_state.get("teams") \
+            or st.session_state.get("disponibles") is None:
+        disponibles = np.ones(len(st.session_state.df), dtype=bool)
+        for team in st.session_state.get("teams") or []:
+            disponibles[[index.fila_de[m] for m in team["members"] if m in index.fila_de]] = False
+        st.session_state.disponibles = disponibles
+        st.session_state.disponibles_teams = st.session_state.get("teams")
+    return st.session_state.disponibles
+
+def taula_actual():
+    """Tabla de equipos de la sesión; se reconstruye solo cuando cambian los equipos."""
+    if st.session_state.get("taula_teams") is not st.session_state.teams:
+        st.session_state.taula = llistat_equips.taula_equips(st.session_state.df, st.session_state.teams)
+        st.session_state.taula_teams = st.session_state.teams
+    return st.session_state.taula
+
+TEAMS_PER_PAGE = 20
+
 df = None
 if 'df' not in st.session_state:
     st.session_state.df = None
@@ -34,19 +138,50 @@ with tabs[0]:
 
     if file is not None:
         try:
-            st.session_state.df = pd.read_json(file)
+            contingut = file.getvalue()
+            digest = hashlib.sha256(contingut).hexdigest()
+            if st.session_state.get("digest") != digest:
+                st.session_state.teams = None
+                st.session_state.job = None
+            st.session_state.df = llegeix_participants(digest, contingut)
+            st.session_state.digest = digest
+            st.session_state.contingut = contingut
             df = st.session_state.df
             st.success("File uploaded successfully!")
             
             st.write("Preview of the uploaded data:")
             st.dataframe(df.head())  
            
+            metode = st.selectbox("Team formation method", list(METODES))
             if st.button("Create Teams"):
-                grups = equips.create_teams()
-                st.session_state.teams = grups
-                st.success("Teams formed successfully!")
+                # La formación de equipos se ejecuta en segundo plano; la página consulta su estado
+                st.session_state.job = treballs.llança(
+                    (digest, metode, MAX_TEAM_SIZE), METODES[metode], contingut, MAX_TEAM_SIZE
+                )
         except Exception as e:
             st.error("There was an error uploading the file. Please check the format.")
+
+    job = treballs.estat(st.session_state.job) if st.session_state.get("job") else None
+    if job is not None and job.clau[0] != st.session_state.get("digest"):
+        # Trabajo de un fichero anterior: su resultado no corresponde a los datos actuales
+        st.session_state.job = None
+        job = None
+    if job is not None:
+        if job.etapa == "error":
+            st.error(f"Team formation failed: {job.error}")
+            st.session_state.job = None
+        elif job.etapa == "done":
+            st.session_state.teams = job.resultat
+            # Puede haber objetivos nuevos en la caché del clasificador: caducan los agregados y el
+            # índice de recomendaciones de este fichero (van con la versión en la clave)
+            versions = versions_etiquetes()
+            versions[job.clau[0]] = versions.get(job.clau[0], 0) + 1
+            st.session_state.job = None
+            st.success("Teams formed successfully!")
+        else:
+            st.progress(job.progres, text=f"Forming teams: {job.etapa}...")
+            time.sleep(0.5)
+            st.rerun()
             
     if st.session_state.df is None:
         st.warning("Please upload the JSON file to continue with the other functions.")
@@ -54,9 +189,6 @@ with tabs[0]:
 # Pestaña 2:
 if len(tab_titles) > 1: 
     with tabs[1]:
-        grups = equips.create_teams()
-        st.session_state.teams = grups
-
         if st.session_state.df is None:
             st.warning("You must first upload the data before accessing this tab.")
         else:
@@ -66,28 +198,44 @@ if len(tab_titles) > 1:
             if "teams" not in st.session_state or not st.session_state.teams:
                 st.warning("Teams have not been formed yet. Please go to 'Create Teams' and generate teams.")
             else:
-                team_input = st.text_input("Enter the team number to view details:", "")
+                taula = taula_actual()
+
+                # Filtros aplicados sobre la tabla de equipos; solo se dibuja la página visible
+                col1, col2 = st.columns(2)
+                team_input = col1.text_input("Team number:", "")
+                member_input = col2.text_input("Member name contains:", "")
+                idiomas = sorted({l for llengues in taula["languages"] for l in llengues})
+                idioma = col1.selectbox("Common language:", ["Any"] + idiomas)
+                tier = col2.selectbox("Skill tier:", ["Any"] + llistat_equips.TIERS)
 
+                team_number = None
                 if team_input:
                     if team_input.isdigit():
                         team_number = int(team_input)
-                        if 1 <= team_number <= len(st.session_state.teams):
-                            selected_team_data = st.session_state.teams[team_number - 1]
-                            st.subheader(f"Details of Team {team_number}")
-                            st.write("**Members:**")
-                            for member in selected_team_data["members"]:
-                                st.write(f"- {member}")
-                        else:
-                            st.warning(f"Team {team_number} does not exist. Please enter a number between 1 and {len(st.session_state.teams)}.")
+                        if not 1 <= team_number <= len(taula):
+                            st.warning(f"Team {team_number} does not exist. Please enter a number between 1 and {len(taula)}.")
                     else:
                         st.warning("Please enter a valid number.")
 
-                for i, team in enumerate(st.session_state.teams):
-                    team_name = f"Team {i+1}" if not team.get("team_group") else team["team_group"]
-                    with st.expander(team_name):
+                filtrats = llistat_equips.filtra_equips(
+                    taula, team_number,
+                    None if idioma == "Any" else idioma,
+                    None if tier == "Any" else tier,
+                    member_input,
+                )
+
+                pages = max(1, -(-len(filtrats) // TEAMS_PER_PAGE))
+                page = st.number_input(f"Page (1-{pages}):", min_value=1, max_value=pages, value=1, step=1)
+                st.caption(f"{len(filtrats)} of {len(taula)} teams")
+
+                for team in llistat_equips.pagina(filtrats, page, TEAMS_PER_PAGE).itertuples():
+                    with st.expander(team.team_group, expanded=team_number is not None):
                         st.write("**Members:**")
-                        for member in team["members"]:
-                            st.write(f"- {member}")          
+                        for member in team.members:
+                            st.write(f"- {member}")
+                        if team.languages:
+                            st.write(f"**Common languages:** {', '.join(team.languages)}")
+                        st.write(f"**Skill tier:** {team.tier}")
 
 # Pestaña 3: 
 if len(tab_titles) > 2: 
@@ -98,51 +246,36 @@ if len(tab_titles) > 2:
             st.header("Participants Analysis")
             st.write("Here you can see a summary od the characteristics of the participants.")
 
-            df = st.session_state.df
+            versio = versio_etiquetes(st.session_state.digest)
+            dades = agregats_roster(st.session_state.digest, versio, st.session_state.df)
+            grafics = grafics_roster(st.session_state.digest, versio, dades)
 
             # Experience Level of Participants (Graphic)
-            level_order = ["Beginner", "Intermediate", "Advanced"]
-            niveles = df['experience_level'].value_counts().reindex(level_order, fill_value=0)
-            fig1, ax1 = plt.subplots(figsize=(4, 3))
-            ax1.bar(niveles.index, niveles.values, color='#189578')
-            ax1.set_title("Experience Level of Participants", fontsize=10)
-            ax1.set_xlabel("Experience Level", fontsize=6)
-            ax1.set_ylabel("Number of Participants", fontsize=6)
-            st.pyplot(fig1)
+            st.image(grafics["experience"])
             st.write()
             st.write()
 
             # Year of Study (Graphic)
-            year_order = ["1st year", "2nd year", "3rd year", "4th year", "Masters", "PhD"]
-            years = df['year_of_study'].value_counts().reindex(year_order, fill_value=0)
-            fig3, ax3 = plt.subplots(figsize=(4, 3))
-            ax3.bar(years.index, years.values, color='#189578')
-            ax3.set_title("Year of Study of Participants", fontsize=10)
-            ax3.set_xlabel("Year of Study", fontsize=6)
-            ax3.set_ylabel("Number of Participants", fontsize=6)
-            ax3.tick_params(axis='x', rotation=45)
-            st.pyplot(fig3)
+            st.image(grafics["years"])
 
             # Summary of the TOP interests
-            intereses = df.explode('interests')['interests'].value_counts().head(10)
             st.subheader("Top Interests of Participants")
-            for i, (interest, count) in enumerate(intereses.items(), start=1):
+            for i, (interest, count) in enumerate(dades.interests[:10], start=1):
                 st.write(f"{i}. {interest}: {count} participants")
             st.write()
             st.write()
 
             # Objectives
             st.subheader("Objectives")
-            objs = {'Socialize': 333, 'Enjoy': 304, 'Learn': 276, 'Win': 62}
-
-            fig, ax = plt.subplots(figsize=(4, 2))
-            ax.bar(objs.keys(), objs.values(), color='#189578')
-            ax.tick_params(axis='both', labelsize=6)
-            ax.set_title("Objectives of the Participants", fontsize=6)
-            ax.set_xlabel("", fontsize=6)
-            ax.set_ylabel("Number of Participants", fontsize=6)
+            st.image(grafics["objectives"])
+            if dades.sense_classificar:
+                st.info(f"{dades.sense_classificar} objectives have not been classified yet. "
+                        "Create teams by compatibility to classify them.")
 
-            st.pyplot(fig)
+            # Programming skills
+            st.subheader("Programming Skills")
+            st.image(grafics["skills"])
+            st.dataframe(dades.skills.head(15))
 # Pestaña 4: 
 if len(tab_titles) > 3:  
     with tabs[3]:
@@ -152,25 +285,28 @@ if len(tab_titles) > 3:
             st.header("Search for a Member in a Team")
             st.write("Enter a name or generate a random one to see which team they are in.")
             
+            index = index_actual()
+
             nombre_leer = st.text_input("Enter a name to see which team they belong to:")
             if nombre_leer:
-                if nombre_leer in st.session_state.df['name'].tolist():
-                    st.session_state.nombre_input = nombre_leer
+                encontrado = index.cerca(nombre_leer)
+                if encontrado:
+                    st.session_state.nombre_input = encontrado
                 else:
-                    st.warning(f'{nombre_leer} is not a member of any group.')
+                    sugerencias = index.prefix(nombre_leer)
+                    if sugerencias:
+                        st.session_state.nombre_input = st.selectbox("Did you mean:", sugerencias)
+                    else:
+                        st.warning(f'{nombre_leer} is not a member of any group.')
 
             if st.button("Generate random name"):
-                nombre_random = random.choice(st.session_state.df['name'].tolist())
+                nombre_random = random.choice(index.noms)
                 st.session_state.nombre_input = nombre_random
 
-            if 'nombre_input' in st.session_state:
+            if 'nombre_input' in st.session_state and st.session_state.nombre_input in index.fila_de:
                 nombre = st.session_state.nombre_input
 
-                found_team = None
-                for team in st.session_state.teams:
-                    if nombre in team["members"]:
-                        found_team = team
-                        break
+                found_team = index.equip(nombre)
 
                 if found_team:
                     st.write(f"**Selected name:** {nombre}")
@@ -182,17 +318,24 @@ if len(tab_titles) > 3:
                 else:
                     st.warning(f"{nombre} is not assigned to any team.")
 
+                if st.button("Suggest teammates"):
+                    recomanacions = index_recomanacions(st.session_state.digest, versio_etiquetes(st.session_state.digest),
+                                                        st.session_state.contingut)
+                    suggerits = recomanacions.recomana(index.fila_de[nombre], 5, disponibles_actuals(index))
+                    if suggerits:
+                        st.write("**Most compatible participants without a team:**")
+                        for fila, puntuacio in suggerits:
+                            st.write(f"- {index.noms[fila]} (score {puntuacio:.1f})")
+                    else:
+                        st.info(f"No compatible participants without a team for {nombre}.")
+
                 if st.button("Show more details"):
-                    si = df.loc[df['name'] == nombre]
-                    edad = si['age'].iloc[0]
-                    year_of_study = si['year_of_study'].iloc[0]
-                    experience_level = si['experience_level'].iloc[0]
-                    objective = si['objective'].iloc[0]
-
-                    st.write(f"**Age:** {edad}")
-                    st.write(f"**Year of study:** {year_of_study}")
-                    st.write(f"**Experience level:** {experience_level}")
-                    st.write(f"**Objectives:** {objective}")
+                    si = index.fila(nombre)
+
+                    st.write(f"**Age:** {si['age']}")
+                    st.write(f"**Year of study:** {si['year_of_study']}")
+                    st.write(f"**Experience level:** {si['experience_level']}")
+                    st.write(f"**Objectives:** {si['objective']}")
 
 st.markdown(
     """